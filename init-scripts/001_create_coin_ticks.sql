@@ -1,3 +1,8 @@
+-- Daily range partitions on event_time (UTC). Partitions are named
+-- coin_ticks_pYYYYMMDD and created ahead / expired by
+-- coin_ticks_maintain_partitions() (004_partition_maintenance.sql), which
+-- the processor calls periodically. Rows outside every daily partition land
+-- in coin_ticks_default and are moved when their day's partition is created.
 CREATE TABLE IF NOT EXISTS public.coin_ticks (
   symbol VARCHAR(16) NOT NULL,
   event_time TIMESTAMP NOT NULL,
@@ -9,7 +14,10 @@ CREATE TABLE IF NOT EXISTS public.coin_ticks (
   volume NUMERIC(38, 8),
   ingest_ts TIMESTAMP DEFAULT NOW(),
   PRIMARY KEY (symbol, event_time)
-);
+) PARTITION BY RANGE (event_time);
 
-CREATE INDEX IF NOT EXISTS idx_coin_ticks_symbol_time_desc
-  ON public.coin_ticks (symbol, event_time DESC);
+-- The primary key already serves (symbol, event_time DESC) scans backwards,
+-- so there is no second index to maintain
+
+CREATE TABLE IF NOT EXISTS public.coin_ticks_default
+  PARTITION OF public.coin_ticks DEFAULT;
@@ -17,30 +17,4 @@ CREATE INDEX IF NOT EXISTS idx_coin_forecasts_symbol_time
 CREATE INDEX IF NOT EXISTS idx_coin_forecasts_created_at 
     ON public.coin_forecasts (created_at DESC);
 
--- Create a view to combine actual and forecasted data
-CREATE OR REPLACE VIEW public.coin_data_with_forecasts AS
-SELECT 
-    symbol,
-    event_time as time,
-    price as actual_price,
-    NULL as predicted_price,
-    NULL as lower_bound,
-    NULL as upper_bound,
-    'actual' as data_type,
-    ingest_ts as timestamp
-FROM public.coin_ticks
-
-UNION ALL
-
-SELECT 
-    symbol,
-    forecast_time as time,
-    NULL as actual_price,
-    predicted_price,
-    lower_bound,
-    upper_bound,
-    'forecast' as data_type,
-    created_at as timestamp
-FROM public.coin_forecasts
-
-ORDER BY symbol, time;
\ No newline at end of file
+-- The combined actual + forecast view lives in 005_create_chart_data.sql
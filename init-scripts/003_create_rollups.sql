@@ -0,0 +1,66 @@
+-- 1-minute and 1-hour OHLCV bars, kept up to date by the processor after
+-- every flush (services/processor/rollups.py). Prices are tick prices within
+-- the bucket; volume, price_change and price_change_percent are Binance's
+-- rolling 24h figures as of the last tick in the bucket.
+CREATE TABLE IF NOT EXISTS public.coin_bars_1m (
+    symbol VARCHAR(16) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    open NUMERIC(38, 8) NOT NULL,
+    high NUMERIC(38, 8) NOT NULL,
+    low NUMERIC(38, 8) NOT NULL,
+    close NUMERIC(38, 8) NOT NULL,
+    price_sum NUMERIC NOT NULL,
+    tick_count INTEGER NOT NULL,
+    mean NUMERIC GENERATED ALWAYS AS (price_sum / tick_count) STORED,
+    volume NUMERIC(38, 8),
+    price_change NUMERIC(38, 8),
+    price_change_percent NUMERIC(9, 4),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (symbol, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS public.coin_bars_1h (
+    LIKE public.coin_bars_1m INCLUDING DEFAULTS INCLUDING GENERATED,
+    PRIMARY KEY (symbol, bucket)
+);
+
+-- Backfill from whatever is already in coin_ticks (no-op on a fresh database)
+INSERT INTO public.coin_bars_1m (
+    symbol, bucket, open, high, low, close, price_sum, tick_count,
+    volume, price_change, price_change_percent
+)
+SELECT
+    symbol,
+    date_trunc('minute', event_time),
+    (array_agg(price ORDER BY event_time))[1],
+    max(price),
+    min(price),
+    (array_agg(price ORDER BY event_time DESC))[1],
+    sum(price),
+    count(*),
+    (array_agg(volume ORDER BY event_time DESC))[1],
+    (array_agg(price_change ORDER BY event_time DESC))[1],
+    (array_agg(price_change_percent ORDER BY event_time DESC))[1]
+FROM public.coin_ticks
+GROUP BY 1, 2
+ON CONFLICT (symbol, bucket) DO NOTHING;
+
+INSERT INTO public.coin_bars_1h (
+    symbol, bucket, open, high, low, close, price_sum, tick_count,
+    volume, price_change, price_change_percent
+)
+SELECT
+    symbol,
+    date_trunc('hour', bucket),
+    (array_agg(open ORDER BY bucket))[1],
+    max(high),
+    min(low),
+    (array_agg(close ORDER BY bucket DESC))[1],
+    sum(price_sum),
+    sum(tick_count),
+    (array_agg(volume ORDER BY bucket DESC))[1],
+    (array_agg(price_change ORDER BY bucket DESC))[1],
+    (array_agg(price_change_percent ORDER BY bucket DESC))[1]
+FROM public.coin_bars_1m
+GROUP BY 1, 2
+ON CONFLICT (symbol, bucket) DO NOTHING;
@@ -0,0 +1,123 @@
+-- Partition maintenance for public.coin_ticks (see 001_create_coin_ticks.sql).
+--
+--   SELECT * FROM coin_ticks_maintain_partitions();          -- 7 days ahead, keep all
+--   SELECT * FROM coin_ticks_maintain_partitions(7, 30);     -- drop days older than 30
+--   SELECT * FROM coin_ticks_maintain_partitions(7, 30, false);  -- detach instead
+--
+-- Creates today .. today + days_ahead, plus a partition for every other day
+-- that has rows sitting in coin_ticks_default (late or backfilled data), then
+-- applies retention. Returns one line per action taken; a day that cannot
+-- be attached is reported as 'failed ...' and retried on the next call
+-- without holding up the other days. Safe to run concurrently (advisory
+-- lock) and repeatedly.
+CREATE OR REPLACE FUNCTION public.coin_ticks_maintain_partitions(
+    days_ahead INTEGER DEFAULT 7,
+    retention_days INTEGER DEFAULT 0,
+    drop_expired BOOLEAN DEFAULT TRUE
+) RETURNS SETOF TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    today DATE := (NOW() AT TIME ZONE 'UTC')::date;
+    day DATE;
+    part TEXT;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('coin_ticks_maintain_partitions'));
+
+    FOR day IN
+        SELECT d::date FROM generate_series(today, today + days_ahead, '1 day') d
+        UNION
+        SELECT DISTINCT event_time::date FROM public.coin_ticks_default
+        ORDER BY 1
+    LOOP
+        part := 'coin_ticks_p' || to_char(day, 'YYYYMMDD');
+        CONTINUE WHEN to_regclass('public.' || part) IS NOT NULL;
+        BEGIN
+            -- Build standalone, pull any of its rows out of the default
+            -- partition, then attach (attach fails if the default still has
+            -- them). ATTACH takes the default's ACCESS EXCLUSIVE lock anyway;
+            -- taking a write lock before the move keeps a concurrent insert
+            -- from landing a row for this day in between.
+            EXECUTE format(
+                'CREATE TABLE public.%I (LIKE public.coin_ticks INCLUDING DEFAULTS)', part);
+            LOCK TABLE public.coin_ticks_default IN EXCLUSIVE MODE;
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM public.coin_ticks_default '
+                'WHERE event_time >= %L AND event_time < %L RETURNING *) '
+                'INSERT INTO public.%I SELECT * FROM moved', day, day + 1, part);
+            EXECUTE format(
+                'ALTER TABLE public.coin_ticks ATTACH PARTITION public.%I '
+                'FOR VALUES FROM (%L) TO (%L)', part, day, day + 1);
+            RETURN NEXT 'created ' || part;
+        EXCEPTION WHEN OTHERS THEN
+            RETURN NEXT 'failed ' || part || ': ' || SQLERRM;
+        END;
+    END LOOP;
+
+    IF retention_days > 0 THEN
+        FOR part IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'public.coin_ticks'::regclass
+              AND c.relname ~ '^coin_ticks_p[0-9]{8}$'
+              AND to_date(substring(c.relname FROM 13), 'YYYYMMDD')
+                  < today - retention_days
+            ORDER BY c.relname
+        LOOP
+            IF drop_expired THEN
+                EXECUTE format('DROP TABLE public.%I', part);
+                RETURN NEXT 'dropped ' || part;
+            ELSE
+                EXECUTE format('ALTER TABLE public.coin_ticks DETACH PARTITION public.%I', part);
+                RETURN NEXT 'detached ' || part;
+            END IF;
+        END LOOP;
+    END IF;
+END;
+$$;
+
+-- One-off conversion of a pre-partitioning coin_ticks (plain table): the
+-- data is copied into daily partitions and views over it are recreated.
+-- Does nothing on a fresh database, where 001 already made it partitioned.
+DO $$
+DECLARE
+    views TEXT[][] := '{}';
+    v RECORD;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'public.coin_ticks'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    FOR v IN
+        SELECT DISTINCT c.oid::regclass::text AS name, pg_get_viewdef(c.oid) AS def
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class c ON c.oid = r.ev_class
+        WHERE d.refobjid = 'public.coin_ticks'::regclass AND c.relkind = 'v'
+    LOOP
+        views := views || ARRAY[[v.name, v.def]];
+        EXECUTE format('DROP VIEW %s', v.name);
+    END LOOP;
+
+    ALTER TABLE public.coin_ticks RENAME TO coin_ticks_legacy;
+    ALTER INDEX IF EXISTS public.coin_ticks_pkey RENAME TO coin_ticks_legacy_pkey;
+    DROP INDEX IF EXISTS public.idx_coin_ticks_symbol_time_desc;
+
+    CREATE TABLE public.coin_ticks (
+        LIKE public.coin_ticks_legacy INCLUDING DEFAULTS,
+        PRIMARY KEY (symbol, event_time)
+    ) PARTITION BY RANGE (event_time);
+    CREATE TABLE public.coin_ticks_default PARTITION OF public.coin_ticks DEFAULT;
+
+    -- Everything lands in the default partition first; the maintenance call
+    -- below gives each day with data its own partition
+    INSERT INTO public.coin_ticks SELECT * FROM public.coin_ticks_legacy;
+    DROP TABLE public.coin_ticks_legacy;
+
+    FOR i IN 1 .. coalesce(array_length(views, 1), 0) LOOP
+        EXECUTE format('CREATE VIEW %s AS %s', views[i][1], views[i][2]);
+    END LOOP;
+END;
+$$;
+
+SELECT * FROM public.coin_ticks_maintain_partitions();
@@ -0,0 +1,47 @@
+-- Chart-ready actual + forecast series, replacing the old UNION ALL view
+-- over every tick and every forecast row. It holds 1-minute actuals (close
+-- of coin_bars_1m) and only the latest forecast run per symbol, keyed and
+-- indexed on (symbol, time) so symbol + time-range queries are index scans.
+--
+-- Kept current incrementally: the processor upserts the actual minutes each
+-- flush touched (services/processor/rollups.py) and the forecaster replaces
+-- a symbol's forecast rows when it saves a new run.
+CREATE TABLE IF NOT EXISTS public.coin_chart_data (
+    symbol VARCHAR(16) NOT NULL,
+    time TIMESTAMP NOT NULL,
+    data_type VARCHAR(8) NOT NULL CHECK (data_type IN ('actual', 'forecast')),
+    actual_price NUMERIC(38, 8),
+    predicted_price NUMERIC(38, 8),
+    lower_bound NUMERIC(38, 8),
+    upper_bound NUMERIC(38, 8),
+    "timestamp" TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (symbol, time, data_type)
+);
+
+-- Same name and columns as before, so dashboards and sample queries keep working
+DROP VIEW IF EXISTS public.coin_data_with_forecasts;
+CREATE VIEW public.coin_data_with_forecasts AS
+SELECT symbol, time, actual_price, predicted_price, lower_bound, upper_bound,
+       data_type, "timestamp"
+FROM public.coin_chart_data;
+
+-- Backfill (no-op on a fresh database)
+INSERT INTO public.coin_chart_data (symbol, time, data_type, actual_price, "timestamp")
+SELECT symbol, bucket, 'actual', close, updated_at
+FROM public.coin_bars_1m
+ON CONFLICT (symbol, time, data_type) DO NOTHING;
+
+-- Rows saved before runs had a single created_at: treat everything written
+-- within 10 minutes of a symbol's newest forecast as its latest run
+INSERT INTO public.coin_chart_data (
+    symbol, time, data_type, predicted_price, lower_bound, upper_bound, "timestamp"
+)
+SELECT f.symbol, f.forecast_time, 'forecast', f.predicted_price,
+       f.lower_bound, f.upper_bound, f.created_at
+FROM public.coin_forecasts f
+JOIN (
+    SELECT symbol, max(created_at) AS latest
+    FROM public.coin_forecasts
+    GROUP BY symbol
+) l ON l.symbol = f.symbol AND f.created_at >= l.latest - INTERVAL '10 minutes'
+ON CONFLICT (symbol, time, data_type) DO NOTHING;
@@ -0,0 +1,98 @@
+-- One row per forecaster run. coin_forecasts keeps a single prediction per
+-- (symbol, forecast_time) and is overwritten by every run; forecast_runs
+-- keeps each run's whole horizon as arrays (point i is at
+-- horizon_start + (i - 1) * step) together with what produced it, so
+-- history is one compact row per run and accuracy can be tracked per run.
+CREATE TABLE IF NOT EXISTS public.forecast_runs (
+    run_id BIGSERIAL PRIMARY KEY,
+    symbol VARCHAR(16) NOT NULL,
+    granularity VARCHAR(8) NOT NULL CHECK (granularity IN ('hour', 'minute')),
+    model VARCHAR(32) NOT NULL DEFAULT 'prophet',
+    params JSONB NOT NULL DEFAULT '{}',
+    train_start TIMESTAMP,
+    train_end TIMESTAMP,
+    train_points INTEGER,
+    fetch_seconds REAL,
+    fit_seconds REAL,
+    predict_seconds REAL,
+    horizon_start TIMESTAMP NOT NULL,
+    step INTERVAL NOT NULL,
+    predicted_price NUMERIC(38, 8)[] NOT NULL,
+    lower_bound NUMERIC(38, 8)[],
+    upper_bound NUMERIC(38, 8)[],
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_forecast_runs_symbol_created
+    ON public.forecast_runs (symbol, created_at DESC);
+
+-- Latest run per symbol, moved in the same transaction that inserts the run,
+-- so "latest" is a primary key lookup instead of a scan over created_at
+CREATE TABLE IF NOT EXISTS public.forecast_latest (
+    symbol VARCHAR(16) PRIMARY KEY,
+    run_id BIGINT NOT NULL REFERENCES public.forecast_runs (run_id) ON DELETE CASCADE,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Which run last wrote each coin_forecasts row
+ALTER TABLE public.coin_forecasts ADD COLUMN IF NOT EXISTS run_id BIGINT;
+
+-- Runs expanded to one row per forecast point
+CREATE OR REPLACE VIEW public.forecast_run_points AS
+SELECT r.run_id, r.symbol, r.granularity, r.created_at,
+       p.step_no,
+       r.horizon_start + (p.step_no - 1) * r.step AS forecast_time,
+       p.predicted_price, p.lower_bound, p.upper_bound
+FROM public.forecast_runs r
+CROSS JOIN LATERAL unnest(r.predicted_price, r.lower_bound, r.upper_bound)
+    WITH ORDINALITY AS p(predicted_price, lower_bound, upper_bound, step_no);
+
+CREATE OR REPLACE VIEW public.forecast_latest_runs AS
+SELECT r.*
+FROM public.forecast_latest l
+JOIN public.forecast_runs r ON r.run_id = l.run_id;
+
+-- Backfill: every (symbol, created_at) group still in coin_forecasts whose
+-- points are evenly spaced becomes a run (no-op on a fresh database)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM public.forecast_runs) THEN
+        INSERT INTO public.forecast_runs (
+            symbol, granularity, model, horizon_start, step,
+            predicted_price, lower_bound, upper_bound, created_at
+        )
+        SELECT symbol,
+               CASE WHEN step < INTERVAL '1 hour' THEN 'minute' ELSE 'hour' END,
+               'prophet', horizon_start, step,
+               predicted_price, lower_bound, upper_bound, created_at
+        FROM (
+            SELECT symbol, created_at,
+                   min(forecast_time) AS horizon_start,
+                   CASE WHEN count(*) > 1
+                        THEN (max(forecast_time) - min(forecast_time)) / (count(*) - 1)
+                        ELSE INTERVAL '1 hour' END AS step,
+                   max(forecast_time) - min(forecast_time) AS span,
+                   count(*) AS points,
+                   array_agg(predicted_price ORDER BY forecast_time) AS predicted_price,
+                   array_agg(lower_bound ORDER BY forecast_time) AS lower_bound,
+                   array_agg(upper_bound ORDER BY forecast_time) AS upper_bound
+            FROM public.coin_forecasts
+            WHERE created_at IS NOT NULL
+            GROUP BY symbol, created_at
+        ) g
+        WHERE step IN (INTERVAL '1 minute', INTERVAL '1 hour')
+          AND span = step * (points - 1)
+        ORDER BY created_at;
+
+        UPDATE public.coin_forecasts f
+        SET run_id = r.run_id
+        FROM public.forecast_runs r
+        WHERE f.run_id IS NULL AND f.symbol = r.symbol AND f.created_at = r.created_at;
+
+        INSERT INTO public.forecast_latest (symbol, run_id, updated_at)
+        SELECT DISTINCT ON (symbol) symbol, run_id, created_at
+        FROM public.forecast_runs
+        ORDER BY symbol, created_at DESC, run_id DESC
+        ON CONFLICT (symbol) DO NOTHING;
+    END IF;
+END $$;
@@ -0,0 +1,157 @@
+-- Forecast accuracy, scored incrementally. Each forecast_runs row gets one
+-- forecast_accuracy row holding running sums; forecast_accuracy_refresh()
+-- scores only the points that matured since the last call (their bar has
+-- closed) against the bar mean the model was trained on: coin_bars_1h for
+-- hourly runs, coin_bars_1m for minute runs. Points are scored in horizon
+-- order, so matured_points is how far into a run scoring has got; a point
+-- whose bar is missing holds the run there until the bar arrives, or is
+-- passed over without a score once it is older than `give_up`.
+CREATE TABLE IF NOT EXISTS public.forecast_accuracy (
+    run_id BIGINT PRIMARY KEY REFERENCES public.forecast_runs (run_id) ON DELETE CASCADE,
+    symbol VARCHAR(16) NOT NULL,
+    granularity VARCHAR(8) NOT NULL,
+    run_created_at TIMESTAMP NOT NULL,
+    horizon_points INTEGER NOT NULL,
+    matured_points INTEGER NOT NULL DEFAULT 0,
+    scored_points INTEGER NOT NULL DEFAULT 0,
+    abs_error_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    pct_error_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    covered_points INTEGER NOT NULL DEFAULT 0,
+    mae DOUBLE PRECISION
+        GENERATED ALWAYS AS (abs_error_sum / NULLIF(scored_points, 0)) STORED,
+    mape DOUBLE PRECISION
+        GENERATED ALWAYS AS (pct_error_sum / NULLIF(scored_points, 0)) STORED,
+    coverage DOUBLE PRECISION
+        GENERATED ALWAYS AS (covered_points::float8 / NULLIF(scored_points, 0)) STORED,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_forecast_accuracy_symbol_created
+    ON public.forecast_accuracy (symbol, run_created_at DESC);
+
+-- Only runs that still have points to score
+CREATE INDEX IF NOT EXISTS idx_forecast_accuracy_pending
+    ON public.forecast_accuracy (run_id) WHERE matured_points < horizon_points;
+
+CREATE INDEX IF NOT EXISTS idx_forecast_runs_created
+    ON public.forecast_runs (created_at);
+
+-- Returns the number of forecast points matured by this call. `settle` is
+-- how long after a bar closes it is treated as final; `give_up` how long
+-- after that a point whose bar never showed up (processor downtime) stops
+-- holding its run back.
+DROP FUNCTION IF EXISTS public.forecast_accuracy_refresh(INTERVAL);
+CREATE OR REPLACE FUNCTION public.forecast_accuracy_refresh(
+    settle INTERVAL DEFAULT '2 minutes',
+    give_up INTERVAL DEFAULT '1 day'
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    now_utc TIMESTAMP := NOW() AT TIME ZONE 'UTC';
+    matured INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('forecast_accuracy_refresh'));
+
+    -- Register runs saved since the newest registered one (with an hour of
+    -- slack for runs that committed out of order)
+    INSERT INTO public.forecast_accuracy (
+        run_id, symbol, granularity, run_created_at, horizon_points
+    )
+    SELECT r.run_id, r.symbol, r.granularity, r.created_at,
+           cardinality(r.predicted_price)
+    FROM public.forecast_runs r
+    WHERE r.created_at > coalesce(
+              (SELECT max(run_created_at) FROM public.forecast_accuracy),
+              '-infinity') - INTERVAL '1 hour'
+    ON CONFLICT (run_id) DO NOTHING;
+
+    WITH due AS (
+        SELECT r.run_id, r.symbol, r.granularity, p.step_no,
+               r.horizon_start + (p.step_no - 1) * r.step AS forecast_time,
+               r.horizon_start + p.step_no * r.step + settle + give_up <= now_utc AS expired,
+               p.predicted_price::float8 AS predicted,
+               p.lower_bound::float8 AS lower_bound,
+               p.upper_bound::float8 AS upper_bound
+        FROM public.forecast_accuracy a
+        JOIN public.forecast_runs r ON r.run_id = a.run_id
+        CROSS JOIN LATERAL unnest(r.predicted_price, r.lower_bound, r.upper_bound)
+            WITH ORDINALITY AS p(predicted_price, lower_bound, upper_bound, step_no)
+        WHERE a.matured_points < a.horizon_points
+          AND p.step_no > a.matured_points
+          AND r.horizon_start + p.step_no * r.step + settle <= now_utc
+    ),
+    scored AS (
+        SELECT d.*,
+               CASE WHEN d.granularity = 'minute' THEN m.mean ELSE h.mean END::float8 AS actual
+        FROM due d
+        LEFT JOIN public.coin_bars_1m m
+            ON d.granularity = 'minute' AND m.symbol = d.symbol AND m.bucket = d.forecast_time
+        LEFT JOIN public.coin_bars_1h h
+            ON d.granularity = 'hour' AND h.symbol = d.symbol AND h.bucket = d.forecast_time
+    ),
+    -- Stop each run at its first point still waiting for a bar
+    gated AS (
+        SELECT *
+        FROM (
+            SELECT s.*,
+                   min(step_no) FILTER (WHERE actual IS NULL AND NOT expired)
+                       OVER (PARTITION BY run_id) AS waiting_at
+            FROM scored s
+        ) w
+        WHERE waiting_at IS NULL OR step_no < waiting_at
+    ),
+    totals AS (
+        SELECT run_id,
+               max(step_no) AS matured_points,
+               count(actual) AS scored,
+               coalesce(sum(abs(predicted - actual)), 0) AS abs_error,
+               coalesce(sum(abs(predicted - actual) / NULLIF(actual, 0) * 100), 0) AS pct_error,
+               count(*) FILTER (WHERE actual BETWEEN lower_bound AND upper_bound) AS covered,
+               count(*) AS points
+        FROM gated
+        GROUP BY run_id
+    ),
+    updated AS (
+        UPDATE public.forecast_accuracy a
+        SET matured_points = t.matured_points,
+            scored_points = a.scored_points + t.scored,
+            abs_error_sum = a.abs_error_sum + t.abs_error,
+            pct_error_sum = a.pct_error_sum + t.pct_error,
+            covered_points = a.covered_points + t.covered,
+            updated_at = NOW()
+        FROM totals t
+        WHERE a.run_id = t.run_id
+        RETURNING t.points
+    )
+    SELECT coalesce(sum(points), 0) INTO matured FROM updated;
+
+    RETURN matured;
+END;
+$$;
+
+-- Per symbol, pooled over every scored point of its runs
+CREATE OR REPLACE VIEW public.forecast_accuracy_by_symbol AS
+SELECT symbol, granularity,
+       count(*) AS runs,
+       sum(scored_points) AS scored_points,
+       sum(abs_error_sum) / NULLIF(sum(scored_points), 0) AS mae,
+       sum(pct_error_sum) / NULLIF(sum(scored_points), 0) AS mape,
+       sum(covered_points)::float8 / NULLIF(sum(scored_points), 0) AS coverage,
+       max(updated_at) AS updated_at
+FROM public.forecast_accuracy
+GROUP BY symbol, granularity;
+
+-- Daily trend per symbol, by the day each run was made
+CREATE OR REPLACE VIEW public.forecast_accuracy_daily AS
+SELECT symbol, granularity,
+       date_trunc('day', run_created_at) AS day,
+       count(*) AS runs,
+       sum(scored_points) AS scored_points,
+       sum(abs_error_sum) / NULLIF(sum(scored_points), 0) AS mae,
+       sum(pct_error_sum) / NULLIF(sum(scored_points), 0) AS mape,
+       sum(covered_points)::float8 / NULLIF(sum(scored_points), 0) AS coverage
+FROM public.forecast_accuracy
+GROUP BY symbol, granularity, date_trunc('day', run_created_at);
+
+-- Score whatever has already matured (no-op on a fresh database)
+SELECT public.forecast_accuracy_refresh();
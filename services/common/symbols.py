@@ -0,0 +1,43 @@
+"""
+Symbol universe shared by the ingestor, processor and forecaster, so all
+three follow the same SYMBOLS / SYMBOLS_FILE setting.
+"""
+
+import os
+
+BINANCE20 = [
+    "BTCUSDT",    # Bitcoin
+    "ETHUSDT",    # Ethereum
+    "BNBUSDT",    # Binance Coin
+    "XRPUSDT",    # Ripple
+    "SOLUSDT",    # Solana
+    "DOGEUSDT",   # Dogecoin
+    "ADAUSDT",    # Cardano
+    "TRXUSDT",    # Tron
+    "AVAXUSDT",   # Avalanche
+    "LINKUSDT",   # Chainlink
+    "DOTUSDT",    # Polkadot
+    "LTCUSDT",    # Litecoin
+    "MATICUSDT",  # Polygon
+    "SHIBUSDT",   # Shiba Inu
+    "XLMUSDT",    # Stellar
+    "BCHUSDT",    # Bitcoin Cash
+    "UNIUSDT",    # Uniswap
+    "ATOMUSDT",   # Cosmos
+    "NEARUSDT",   # NEAR Protocol
+    "PEPEUSDT"    # Pepe
+]
+
+
+def load_symbols() -> list:
+    """Symbol universe: SYMBOLS (comma separated) or SYMBOLS_FILE (one per line), else BINANCE20."""
+    symbols = os.getenv("SYMBOLS", "")
+    path = os.getenv("SYMBOLS_FILE")
+    if path:
+        with open(path) as f:
+            symbols = ",".join(line.split("#")[0] for line in f)
+    symbols = [sym.strip().upper() for sym in symbols.split(",") if sym.strip()]
+    return list(dict.fromkeys(symbols)) or list(BINANCE20)
+
+
+SYMBOLS = load_symbols()
@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+
+import orjson
+import websocket
+from configs import SYMBOLS
+from kafka import KafkaProducer
+from kafka.admin import KafkaAdminClient, NewTopic
+from kafka.errors import TopicAlreadyExistsError
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+handler = logging.StreamHandler()
+handler.setLevel(logging.INFO)
+
+formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+handler.setFormatter(formatter)
+
+logger.addHandler(handler)
+
+
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:29092")
+KAFKA_TOPIC = os.getenv("KAFKA_TOPIC", "binance.ticker")
+KAFKA_PARTITIONS = int(os.getenv("KAFKA_PARTITIONS", "6"))
+# Producer batching: wait up to LINGER_MS to fill BATCH_BYTES per partition
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "50"))
+KAFKA_BATCH_BYTES = int(os.getenv("KAFKA_BATCH_BYTES", str(256 * 1024)))
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION", "gzip")
+
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+
+SYMBOL_SET = frozenset(SYMBOLS)
+
+
+def ensure_topic():
+    admin = KafkaAdminClient(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS)
+    try:
+        admin.create_topics([NewTopic(KAFKA_TOPIC, KAFKA_PARTITIONS, 1)])
+        logger.info("Created topic %s with %d partitions",
+                    KAFKA_TOPIC, KAFKA_PARTITIONS)
+    except TopicAlreadyExistsError:
+        pass
+    finally:
+        admin.close()
+
+
+def create_producer() -> KafkaProducer:
+    return KafkaProducer(
+        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+        linger_ms=KAFKA_LINGER_MS,
+        batch_size=KAFKA_BATCH_BYTES,
+        compression_type=KAFKA_COMPRESSION,
+        acks=1,
+    )
+
+
+class Ingestor:
+    """Splits `!ticker@arr` frames into one Kafka record per ticker.
+
+    Records are keyed by symbol so every symbol stays on one partition, in
+    order, and the processor consumer group can scale by partition.
+    """
+
+    def __init__(self, producer: KafkaProducer):
+        self.producer = producer
+        self.published = 0
+
+    def handle_message(self, message: str):
+        data = orjson.loads(message)
+        if not isinstance(data, list):
+            return
+        for dat in data:
+            sym = dat.get("s")
+            if sym not in SYMBOL_SET:
+                continue
+            self.producer.send(
+                KAFKA_TOPIC, key=sym.encode(), value=orjson.dumps(dat)
+            ).add_errback(self.on_send_error)
+            self.published += 1
+
+    @staticmethod
+    def on_send_error(exc):
+        logger.error("Kafka produce failed: %s", exc)
+
+
+def on_message(ws, message):
+    ws.ingestor.handle_message(message)
+
+
+def on_error(ws, error):
+    logger.error("WebSocket error: %s", error)
+
+
+def on_close(ws, close_status_code, close_msg):
+    logger.info("WebSocket connection closed: status=%s msg=%s",
+                close_status_code, close_msg)
+
+
+def on_open(ws):
+    logger.info("WebSocket connection opened")
+
+
+def main():
+    url = f"{BINANCE_WS_URL}/ws/!ticker@arr"
+    ensure_topic()
+    ingestor = Ingestor(create_producer())
+    while True:
+        try:
+            ws = websocket.WebSocketApp(
+                url,
+                on_open=on_open,
+                on_message=on_message,
+                on_error=on_error,
+                on_close=on_close
+            )
+            ws.ingestor = ingestor
+            ws.run_forever(ping_interval=15, ping_timeout=10)
+        except Exception as e:
+            logger.error("WebSocket connection error: %s", e)
+        ingestor.producer.flush()
+        logger.info("Published %d tickers so far", ingestor.published)
+        time.sleep(5)
+
+
+if __name__ == "__main__":
+    main()
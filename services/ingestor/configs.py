@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The symbol list lives in services/common; images copy it next to the code
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+
+from symbols import BINANCE20, SYMBOLS, load_symbols  # noqa: E402,F401
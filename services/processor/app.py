@@ -7,9 +7,21 @@ from decimal import Decimal
 
 import psycopg2
 import websocket
-from configs import BINANCE20
+from change_filter import ChangeFilter, event_seconds
+from configs import SYMBOLS
+from copy_writer import insert_batch_copy
+from db import open_pg
+from fastdecode import SYMBOL_SET, TICKS_SKIPPED, as_ticker_list, parse_fast
+from kafka_source import run_kafka_consumer
+from flush_scheduler import FlushScheduler
+from metrics import REGISTRY, start_http_server, start_log_reporter
+from partitions import PartitionMaintainer
+from pipeline import Pipeline
+from rollups import refresh_rollups
+from shards import ShardSupervisor
+from spool import Spool
 from psycopg2.extras import execute_values
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import stop_after_attempt
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -23,19 +35,72 @@ formatter = logging.Formatter(
 )
 handler.setFormatter(formatter)
 
-logger.addHandler(handler)
+# Gắn vào root logger để các module khác (pipeline, metrics, ...) cũng in ra
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(handler)
 
 
-PG_CONN_INFO = dict(
-    host=os.getenv("POSTGRES_HOST"),
-    port=os.getenv("POSTGRES_PORT"),
-    dbname=os.getenv("POSTGRES_DB"),
-    user=os.getenv("POSTGRES_USER"),
-    password=os.getenv("POSTGRES_PASSWORD")
-)
-
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "200"))
 FLUSH_SECS = float(os.getenv("FLUSH_SECS", "1.0"))
+# Adaptive flushing: BATCH_SIZE is the starting size, FLUSH_SECS the longest
+# a row may wait in the buffer
+TARGET_COMMIT_SECS = float(os.getenv("TARGET_COMMIT_SECS", "0.2"))
+BATCH_SIZE_MIN = int(os.getenv("BATCH_SIZE_MIN", "50"))
+BATCH_SIZE_MAX = int(os.getenv("BATCH_SIZE_MAX", "10000"))
+FLUSH_SECS_MIN = float(os.getenv("FLUSH_SECS_MIN", "0.1"))
+# "values" = multi-row INSERT via execute_values, "copy" = binary COPY + merge
+INSERT_MODE = os.getenv("INSERT_MODE", "values")
+# "decimal" = Decimal/datetime rows, "fast" = float prices + epoch-ms timestamps
+DECODE_MODE = os.getenv("DECODE_MODE", "decimal")
+
+# Drop snapshots whose stored values did not change, but still write one row
+# per symbol every HEARTBEAT_SECS (0 = never). Off by default: it thins quiet
+# symbols' rows, which skews the tick-weighted bar means
+SUPPRESS_UNCHANGED = os.getenv("SUPPRESS_UNCHANGED", "0") == "1"
+HEARTBEAT_SECS = float(os.getenv("HEARTBEAT_SECS", "60"))
+
+# Re-aggregate the coin_bars_1m/1h buckets touched by every flush
+ROLLUPS = os.getenv("ROLLUPS", "1") == "1"
+
+# Receive/parse/write pipeline
+FRAME_QUEUE_SIZE = int(os.getenv("FRAME_QUEUE_SIZE", "1000"))
+ROW_QUEUE_SIZE = int(os.getenv("ROW_QUEUE_SIZE", "1000"))
+BACKPRESSURE = os.getenv("BACKPRESSURE", "drop_oldest")
+METRICS_LOG_SECS = float(os.getenv("METRICS_LOG_SECS", "60"))
+# Prometheus text format on http://0.0.0.0:METRICS_PORT/metrics (0 = off)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Market data endpoints (override to point at fake_binance.py)
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+BINANCE_REST_URL = os.getenv("BINANCE_REST_URL", "https://api.binance.com")
+# SHARDS > 0 = that many worker processes on combined per-symbol streams,
+# 0 = a single !ticker@arr connection filtered to SYMBOLS
+SHARDS = int(os.getenv("SHARDS", "0"))
+SHARD_BACKFILL = os.getenv("SHARD_BACKFILL", "1") == "1"
+
+# "websocket" = read Binance directly, "kafka" = consume the ingestor's topic
+SOURCE = os.getenv("SOURCE", "websocket")
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:29092")
+KAFKA_TOPIC = os.getenv("KAFKA_TOPIC", "binance.ticker")
+KAFKA_GROUP_ID = os.getenv("KAFKA_GROUP_ID", "processor")
+KAFKA_MAX_POLL_RECORDS = int(os.getenv("KAFKA_MAX_POLL_RECORDS", "5000"))
+
+# Disk spool for rows that cannot be written while Postgres is unavailable
+SPOOL_DIR = os.getenv("SPOOL_DIR", "spool")
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+SPOOL_MAX_BYTES = int(os.getenv("SPOOL_MAX_BYTES", "0"))  # 0 = unlimited
+SPOOL_REPLAY_ROWS = int(os.getenv("SPOOL_REPLAY_ROWS", "20000"))
+RECONNECT_SECS = float(os.getenv("RECONNECT_SECS", "5.0"))
+
+# coin_ticks daily partitions: create PARTITION_DAYS_AHEAD days ahead and
+# drop (RETENTION_MODE=drop) or detach (=detach) days older than
+# RETENTION_DAYS (0 = keep everything), every PARTITION_MAINTENANCE_SECS
+# (0 = leave it to something else, e.g. a cron job calling the SQL function)
+PARTITION_MAINTENANCE_SECS = float(os.getenv("PARTITION_MAINTENANCE_SECS", "3600"))
+PARTITION_DAYS_AHEAD = int(os.getenv("PARTITION_DAYS_AHEAD", "7"))
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "0"))
+RETENTION_MODE = os.getenv("RETENTION_MODE", "drop")
 
 
 def to_decimal(s: str) -> Decimal:
@@ -47,15 +112,15 @@ def to_ts_ms(ms: int) -> datetime:
                                   tz=timezone.utc).replace(tzinfo=None)
 
 
-@retry(stop=stop_after_attempt(5), wait=wait_exponential(min=1, max=30))
-def open_pg():
-    logger.info("Connecting to Postgres...")
-    return psycopg2.connect(**PG_CONN_INFO)
+EPOCH_MS_TEMPLATE = (
+    "(%s, to_timestamp(%s / 1000.0) AT TIME ZONE 'UTC', %s, %s, %s, %s, %s, %s, "
+    "to_timestamp(%s / 1000.0) AT TIME ZONE 'UTC')"
+)
 
 
-def insert_batch(conn, rows):
+def insert_batch(conn, rows) -> int:
     if not rows:
-        return
+        return 0
 
     sql = """
         INSERT INTO public.coin_ticks (
@@ -64,59 +129,228 @@ def insert_batch(conn, rows):
         ON CONFLICT (symbol, event_time) DO NOTHING 
     """
 
+    # Rows from the fast decoder carry epoch milliseconds instead of datetimes
+    template = EPOCH_MS_TEMPLATE if isinstance(rows[0][1], int) else None
+
+    # One statement per batch, so rowcount is the number actually inserted
     with conn.cursor() as cur:
-        execute_values(cur, sql, rows)
+        execute_values(cur, sql, rows, template=template, page_size=len(rows))
+        inserted = cur.rowcount
     conn.commit()
+    return inserted
+
+
+def parse_decimal(message: str) -> list:
+    rows = []
+    for dat in as_ticker_list(json.loads(message)):
+        sym = dat.get("s")
+        if sym not in SYMBOL_SET:
+            continue
+        try:
+            event_time = to_ts_ms(int(dat["E"]))
+            price = to_decimal(dat["c"])
+            price_change = to_decimal(dat["p"])
+            price_change_percent = to_decimal(dat["P"])
+            high = to_decimal(dat["h"])
+            low = to_decimal(dat["l"])
+            volume = to_decimal(dat["v"])
+        except Exception as e:
+            TICKS_SKIPPED.inc()
+            logger.warning("Skip bad message: %s", e)
+            continue
+
+        rows.append((
+            sym, event_time, price, price_change,
+            price_change_percent, high, low, volume, datetime.utcnow()
+        ))
+    return rows
+
+
+DECODERS = {
+    "decimal": parse_decimal,
+    "fast": parse_fast,
+}
+
+
+WRITERS = {
+    "values": insert_batch,
+    "copy": insert_batch_copy,
+}
 
 
 class Processor:
-    def __init__(self):
-        self.conn = open_pg()
+    def __init__(self, use_spool: bool = True):
+        self.connect_seconds = REGISTRY.counter(
+            "pg_connect_seconds_total", "Time spent in open_pg(), backoff included")
+        self.reconnects = REGISTRY.counter(
+            "pg_reconnects_total", "Successful Postgres reconnects")
+        # Connected by the first flush: if Postgres is down at (re)start, rows
+        # go to the spool instead of the process dying in open_pg()'s backoff
+        self.conn = None
+        self.parse_message = DECODERS[DECODE_MODE]
+        self.write_batch = WRITERS[INSERT_MODE]
+        # Without a spool (Kafka source) failed rows stay in the buffer and
+        # the caller decides how to retry them
+        self.spool = Spool(SPOOL_DIR, SPOOL_SEGMENT_BYTES, SPOOL_MAX_BYTES) \
+            if use_spool else None
+        self.scheduler = FlushScheduler(
+            BATCH_SIZE, FLUSH_SECS, TARGET_COMMIT_SECS,
+            BATCH_SIZE_MIN, BATCH_SIZE_MAX, FLUSH_SECS_MIN)
+        self.change_filter = ChangeFilter(HEARTBEAT_SECS) if SUPPRESS_UNCHANGED else None
+        self.rollups = ROLLUPS
         self.buffer = []
         self.last_flush = time.time()
+        self.reconnect_at = 0.0
+        self.connected_once = False
+        self.spooled_rows = REGISTRY.counter(
+            "spooled_rows_total", "Rows written to the disk spool")
+        self.replayed_rows = REGISTRY.counter(
+            "replayed_rows_total", "Spooled rows replayed into Postgres")
+        self.ticks_parsed = REGISTRY.counter(
+            "ticks_parsed_total", "Rows decoded from frames")
+        self.rows_inserted = REGISTRY.counter(
+            "rows_inserted_total", "Rows inserted into coin_ticks")
+        self.rows_conflicted = REGISTRY.counter(
+            "rows_conflict_dropped_total",
+            "Rows skipped by ON CONFLICT (already in coin_ticks)")
+        self.buffer_depth = REGISTRY.gauge(
+            "buffer_rows", "Rows buffered for the next flush")
+        self.parse_seconds = REGISTRY.histogram(
+            "parse_seconds", "Time to decode one frame")
+        self.flush_seconds = REGISTRY.histogram(
+            "flush_seconds", "Time to write and commit one batch")
+        self.commit_latency = REGISTRY.histogram(
+            "event_commit_latency_seconds",
+            "Binance event_time to Postgres commit, per row")
+        self.rollup_seconds = REGISTRY.histogram(
+            "rollup_seconds", "Time to refresh the bars touched by one batch")
+
+    def connect(self, opener):
+        started = time.perf_counter()
+        try:
+            return opener()
+        finally:
+            self.connect_seconds.inc(time.perf_counter() - started)
+
+    def parse(self, message) -> list:
+        started = time.perf_counter()
+        rows = self.parse_message(message)
+        self.parse_seconds.observe(time.perf_counter() - started)
+        self.ticks_parsed.inc(len(rows))
+        return rows
 
     def handle_message(self, message: str):
-        data = json.loads(message)
-        if not isinstance(data, list):
-            return
-        for dat in data:
-            sym = dat.get("s")
-            if sym not in BINANCE20:
-                continue
-            try:
-                event_time = to_ts_ms(int(dat["E"]))
-                price = to_decimal(dat["c"])
-                price_change = to_decimal(dat["p"])
-                price_change_percent = to_decimal(dat["P"])
-                high = to_decimal(dat["h"])
-                low = to_decimal(dat["l"])
-                volume = to_decimal(dat["v"])
-            except Exception as e:
-                logger.warning("Skip bad message: %s", e)
-                continue
-
-            self.buffer.append((
-                sym, event_time, price, price_change,
-                price_change_percent, high, low, volume, datetime.utcnow()
-            ))
+        self.add_rows(self.parse(message))
+        self.maybe_flush()
 
+    def add_rows(self, rows: list):
+        if self.change_filter is not None:
+            rows = self.change_filter.filter(rows)
+        self.buffer.extend(rows)
+        self.buffer_depth.set(len(self.buffer))
+
+    def next_flush_at(self) -> float:
+        return self.scheduler.next_flush_at(self.last_flush)
+
+    def maybe_flush(self):
+        if self.scheduler.due(len(self.buffer), self.last_flush, time.time()):
+            self.flush()
+
+    def flush(self) -> bool:
+        """Write the buffer; True once it is committed to Postgres."""
         now = time.time()
-        if len(self.buffer) >= BATCH_SIZE or (now - self.last_flush) >= FLUSH_SECS:
-            try:
-                insert_batch(self.conn, self.buffer)
-                self.buffer.clear()
-                self.last_flush = now
-            except Exception as e:
-                logger.error("Database error: %s", e)
-                try:
-                    self.conn.close()
-                except Exception:
-                    pass
-                self.conn = open_pg()
+        elapsed = now - self.last_flush
+        self.last_flush = now
+        if self.conn is None and not self.reconnect(now):
+            self.spool_buffer()
+            return False
+        try:
+            # Drain the backlog one large batch per flush so live rows are
+            # never stuck behind a long replay
+            if self.spool is not None and self.spool.pending():
+                self.replayed_rows.inc(
+                    self.spool.replay(self.replay_batch, SPOOL_REPLAY_ROWS))
+            rows = len(self.buffer)
+            started = time.perf_counter()
+            self.count_written(rows, self.write_batch(self.conn, self.buffer))
+            commit_secs = time.perf_counter() - started
+            self.scheduler.observe(rows, commit_secs, elapsed)
+            if rows:
+                self.flush_seconds.observe(commit_secs)
+                committed = time.time()
+                self.commit_latency.observe_many(
+                    committed - event_seconds(row[1]) for row in self.buffer)
+                self.refresh_rollups(self.buffer)
+            self.buffer.clear()
+            self.buffer_depth.set(0)
+            return True
+        except Exception as e:
+            logger.error("Database error: %s", e)
+            self.disconnect(now)
+            self.spool_buffer()
+            return False
+
+    def count_written(self, rows: int, inserted):
+        # Writers return the number of rows ON CONFLICT let through
+        if inserted is not None:
+            self.rows_inserted.inc(inserted)
+            self.rows_conflicted.inc(rows - inserted)
+
+    def replay_batch(self, rows):
+        self.count_written(len(rows), self.write_batch(self.conn, rows))
+        self.refresh_rollups(rows)
+        logger.info("Replayed %d spooled rows", len(rows))
+
+    def refresh_rollups(self, rows):
+        # Rows are committed already; if this fails the batch is spooled and
+        # rewritten, which recomputes the same buckets again
+        if not self.rollups:
+            return
+        started = time.perf_counter()
+        try:
+            refresh_rollups(self.conn, rows)
+        except psycopg2.errors.UndefinedTable as e:
+            self.conn.rollback()
+            self.rollups = False
+            logger.error("Rollups disabled, apply init-scripts/003 and 005: %s", e)
+            return
+        self.rollup_seconds.observe(time.perf_counter() - started)
+
+    def spool_buffer(self):
+        if self.buffer and self.spool is not None:
+            self.spool.append(self.buffer)
+            self.spooled_rows.inc(len(self.buffer))
+            self.buffer.clear()
+            self.buffer_depth.set(0)
+
+    def disconnect(self, now: float):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+        self.reconnect_at = now + RECONNECT_SECS
+
+    def reconnect(self, now: float) -> bool:
+        # Single attempt per RECONNECT_SECS: the writer keeps spooling instead
+        # of sitting in open_pg()'s backoff while frames pile up
+        if now < self.reconnect_at:
+            return False
+        try:
+            self.conn = self.connect(open_pg.retry_with(
+                stop=stop_after_attempt(1), reraise=True))
+            if self.connected_once:
+                self.reconnects.inc()
+            self.connected_once = True
+            return True
+        except Exception as e:
+            logger.warning("Postgres still unavailable: %s", e)
+            self.reconnect_at = now + RECONNECT_SECS
+            return False
 
 
 def on_message(ws, message):
-    ws.processor.handle_message(message)
+    ws.pipeline.submit(message)
 
 
 def on_error(ws, error):
@@ -130,10 +364,32 @@ def on_close(ws, close_status_code, close_msg):
 
 def on_open(ws):
     logger.info("WebSocket connection opened")
+    REGISTRY.counter("websocket_connects_total", "Websocket (re)connects").inc()
 
 
 def main():
-    url = "wss://stream.binance.com:9443/ws/!ticker@arr"
+    if METRICS_PORT > 0:
+        start_http_server(METRICS_PORT)
+    if PARTITION_MAINTENANCE_SECS > 0:
+        PartitionMaintainer(open_pg, PARTITION_MAINTENANCE_SECS,
+                            PARTITION_DAYS_AHEAD, RETENTION_DAYS,
+                            RETENTION_MODE == "drop").start()
+    if SOURCE == "kafka":
+        start_log_reporter(logger, METRICS_LOG_SECS)
+        run_kafka_consumer(Processor(use_spool=False), KAFKA_BOOTSTRAP_SERVERS,
+                           KAFKA_TOPIC, KAFKA_GROUP_ID, KAFKA_MAX_POLL_RECORDS)
+        return
+
+    url = f"{BINANCE_WS_URL}/ws/!ticker@arr"
+    pipeline = Pipeline(Processor(), FRAME_QUEUE_SIZE, ROW_QUEUE_SIZE,
+                        BACKPRESSURE)
+    pipeline.start()
+    start_log_reporter(logger, METRICS_LOG_SECS)
+    if SHARDS > 0:
+        ShardSupervisor(pipeline, SYMBOLS, SHARDS, DECODERS[DECODE_MODE],
+                        BINANCE_WS_URL, BINANCE_REST_URL, ROW_QUEUE_SIZE,
+                        SHARD_BACKFILL).run()
+        return
     while True:
         try:
             ws = websocket.WebSocketApp(
@@ -143,7 +399,7 @@ def main():
                 on_error=on_error,
                 on_close=on_close
             )
-            ws.processor = Processor()
+            ws.pipeline = pipeline
             ws.run_forever(ping_interval=15, ping_timeout=10)
         except Exception as e:
             logger.error("WebSocket connection error: %s", e)
@@ -0,0 +1,130 @@
+"""
+Benchmark coin_ticks' NUMERIC columns against the double precision layout.
+
+Builds one scratch table per layout (coin_ticks' columns with the price /
+volume types from compact_ticks.COLUMN_TYPES), fills both with the same
+synthetic 1-tick-per-second series through a multi-row INSERT like
+insert_batch, then reports table size, insert rows/sec and the hourly
+aggregation the forecaster used to run over raw ticks (date_trunc('hour')
++ avg(price) per symbol, read into Python floats). The scratch tables are
+dropped afterwards unless --keep is given.
+
+    python bench_compact.py --symbols 20 --hours 24
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from psycopg2.extras import execute_values
+
+from compact_ticks import COLUMN_TYPES, COLUMNS
+from db import open_pg
+
+HOURLY_QUERY = """
+    SELECT date_trunc('hour', event_time) AS ds, avg(price) AS y
+    FROM {table}
+    WHERE symbol = %s AND event_time >= %s
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+
+def make_rows(symbols: int, hours: int) -> list:
+    start = datetime(2000, 1, 1)
+    rng = random.Random(42)
+    rows = []
+    for s in range(symbols):
+        price = 10 ** rng.uniform(-5, 5)
+        for i in range(hours * 3600):
+            price *= 1 + rng.gauss(0, 0.0005)
+            rows.append((
+                f"BENCH{s:04d}", start + timedelta(seconds=i),
+                round(price, 8), round(price * 0.01, 8), 1.2345,
+                round(price * 1.05, 8), round(price * 0.95, 8), 123456.789, start,
+            ))
+    return rows
+
+
+def create_table(conn, table: str, kind: str):
+    types = dict(symbol="varchar(16)", event_time="timestamp", ingest_ts="timestamp",
+                 **COLUMN_TYPES[kind])
+    columns = ", ".join(f"{name} {types[name]}" for name in COLUMNS)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute(f"CREATE TABLE {table} ({columns}, PRIMARY KEY (symbol, event_time))")
+    conn.commit()
+
+
+def insert(conn, table: str, rows: list, batch_size: int) -> float:
+    sql = f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES %s ON CONFLICT DO NOTHING"
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            execute_values(cur, sql, batch, page_size=len(batch))
+            conn.commit()
+    return len(rows) / (time.perf_counter() - started)
+
+
+def aggregate(conn, table: str, symbols: list, repeat: int) -> float:
+    """Best-of-`repeat` seconds to fetch every symbol's hourly series."""
+    best = float("inf")
+    with conn.cursor() as cur:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for symbol in symbols:
+                cur.execute(HOURLY_QUERY.format(table=table), (symbol, datetime(2000, 1, 1)))
+                # What the forecaster does after read_sql_query + to_numeric
+                [float(y) for _, y in cur.fetchall()]
+            best = min(best, time.perf_counter() - started)
+    conn.rollback()
+    return best
+
+
+def table_size(conn, table: str) -> int:
+    with conn.cursor() as cur:
+        cur.execute(f"VACUUM ANALYZE {table}")
+        cur.execute("SELECT pg_total_relation_size(%s)", (table,))
+        return cur.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--hours", type=int, default=24,
+                        help="hours of 1-second ticks per symbol")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tables")
+    args = parser.parse_args()
+
+    rows = make_rows(args.symbols, args.hours)
+    symbols = sorted({row[0] for row in rows})
+    print(f"{len(rows):,} rows, {len(symbols)} symbols")
+    print(f"{'layout':<9}{'size MB':>9}{'bytes/row':>11}{'insert rows/sec':>17}{'hourly agg ms':>15}")
+
+    conn = open_pg()
+    conn.autocommit = False
+    try:
+        for kind in COLUMN_TYPES:
+            table = f"bench_ticks_{kind}"
+            create_table(conn, table, kind)
+            rate = insert(conn, table, rows, args.batch_size)
+            conn.autocommit = True
+            size = table_size(conn, table)
+            conn.autocommit = False
+            seconds = aggregate(conn, table, symbols, args.repeat)
+            print(f"{kind:<9}{size / 2**20:>9.1f}{size / len(rows):>11.1f}"
+                  f"{rate:>17,.0f}{seconds * 1000:>15.1f}")
+            if not args.keep:
+                with conn.cursor() as cur:
+                    cur.execute(f"DROP TABLE {table}")
+                conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
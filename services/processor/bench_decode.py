@@ -0,0 +1,94 @@
+"""
+Micro-benchmark the tick decoders (Decimal/datetime vs fast path).
+
+Builds a synthetic `!ticker@arr` frame with `--tickers` entries, of which the
+BINANCE20 symbols are kept, and times each decoder over `--frames` frames.
+First checks that every decoder returns the same ticks, for the compact frame
+and for the same frame with whitespace.
+
+    python bench_decode.py --frames 2000 --tickers 400
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from app import DECODERS
+from configs import BINANCE20
+from fastdecode import orjson
+
+
+def make_frame(tickers: int) -> str:
+    data = []
+    for i in range(tickers):
+        sym = BINANCE20[i] if i < len(BINANCE20) else f"ALT{i:04d}USDT"
+        data.append({
+            "e": "24hrTicker", "E": 1727069554471 + i, "s": sym,
+            "p": "100.00", "P": "0.500", "w": "20000.25", "x": "19900.00",
+            "c": "20000.01", "Q": "0.1", "b": "19999.00", "B": "1.5",
+            "a": "20001.00", "A": "2.0", "o": "19900.00", "h": "20100.00",
+            "l": "19800.00", "v": "1234.56", "q": "24691357.89",
+            "O": 1726983154471, "C": 1727069554471, "F": 100, "L": 200,
+            "n": 101,
+        })
+    # Binance sends compact JSON
+    return json.dumps(data, separators=(",", ":"))
+
+
+def comparable(rows) -> list:
+    """Decoded rows as (symbol, event ms, floats...), minus the ingest time"""
+    out = []
+    for sym, event_time, *values, _ingest in rows:
+        if isinstance(event_time, datetime):
+            event_time = round(event_time.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        out.append((sym, event_time, *map(float, values)))
+    return out
+
+
+def check_decoders(frame: str) -> bool:
+    variants = {
+        "compact": frame,
+        "spaced": json.dumps(json.loads(frame)),
+        "indented": json.dumps(json.loads(frame), indent=1),
+    }
+    agree = True
+    for name, message in variants.items():
+        decoded = {mode: comparable(decode(message)) for mode, decode in DECODERS.items()}
+        expected = decoded["decimal"]
+        for mode, rows in decoded.items():
+            if rows != expected or not rows:
+                print(f"{mode} decoder disagrees on the {name} frame: "
+                      f"{len(rows)} ticks vs {len(expected)}")
+                agree = False
+    return agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=400)
+    args = parser.parse_args()
+
+    frame = make_frame(args.tickers)
+    if not check_decoders(frame):
+        sys.exit(1)
+    print(f"json decoder: {'orjson' if orjson else 'json'}, "
+          f"frame: {len(frame):,} bytes, {args.tickers} tickers")
+    print(f"{'mode':<9}{'frames/sec':>12}{'us/frame':>11}{'speedup':>9}")
+
+    baseline = None
+    for mode, decode in DECODERS.items():
+        started = time.perf_counter()
+        for _ in range(args.frames):
+            decode(frame)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{mode:<9}{args.frames / elapsed:>12,.0f}"
+              f"{elapsed / args.frames * 1e6:>11,.1f}"
+              f"{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
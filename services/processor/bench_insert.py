@@ -0,0 +1,74 @@
+"""
+Benchmark the coin_ticks writers (execute_values vs binary COPY + merge).
+
+Runs against the database configured by the usual POSTGRES_* env vars and
+writes synthetic rows under BENCH* symbols, which are deleted afterwards.
+
+    python bench_insert.py --rows 50000 --batch-size 200 500 2000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app import WRITERS
+from db import open_pg
+
+BENCH_PREFIX = "BENCH"
+
+
+def make_rows(n: int, symbols: int = 20):
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=1)
+    rows = []
+    for i in range(n):
+        price = Decimal("100.12345678") + Decimal(i % 997) / 100
+        rows.append((
+            f"{BENCH_PREFIX}{i % symbols:04d}",
+            start + timedelta(milliseconds=i),
+            price, Decimal("-1.5"), Decimal("0.2500"),
+            price + 1, price - 1, Decimal("123456.789"),
+            datetime.utcnow(),
+        ))
+    return rows
+
+
+def cleanup(conn):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM public.coin_ticks WHERE symbol LIKE %s",
+                    (BENCH_PREFIX + "%",))
+    conn.commit()
+
+
+def run(conn, mode: str, rows, batch_size: int) -> float:
+    write = WRITERS[mode]
+    cleanup(conn)
+    started = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        write(conn, rows[i:i + batch_size])
+    elapsed = time.perf_counter() - started
+    cleanup(conn)
+    return len(rows) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--modes", nargs="+", default=sorted(WRITERS))
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    conn = open_pg()
+    try:
+        print(f"{'mode':<8}{'batch':>8}{'rows/sec':>14}")
+        for batch_size in args.batch_size:
+            for mode in args.modes:
+                rate = run(conn, mode, rows, batch_size)
+                print(f"{mode:<8}{batch_size:>8}{rate:>14,.0f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+End-to-end processor benchmark: replay frames through Processor at max speed.
+
+Frames come from a capture (see capture.py) or, without one, are synthesised
+by fake_binance.Market. Either way event times fall in 2000-01-01 (captured
+ones are shifted there, keeping their spacing) so they never collide with
+real data; those rows, and the bars and chart minutes rolled up from them,
+are deleted after each run. Every --decode x --insert combination is
+run against the usual POSTGRES_* database; only SYMBOLS are written, so set
+SYMBOLS/SYMBOLS_FILE to widen the universe.
+
+    python bench_processor.py --frames 600 --symbols 400
+    python bench_processor.py --capture captures/ticker.jsonl.gz --decode fast
+"""
+
+import argparse
+import json
+import resource
+import time
+from datetime import datetime
+
+from app import DECODERS, WRITERS, Processor
+from capture import read_capture
+from configs import BINANCE20
+from db import open_pg
+from fake_binance import Market
+from fastdecode import as_ticker_list
+
+SYNTHETIC_START_MS = 946684800000  # 2000-01-01T00:00:00Z
+SYNTHETIC_SPAN_MS = 86400000  # cleanup_synthetic() deletes up to 2000-01-02
+
+
+def synthetic_frames(frames: int, symbols: int) -> list:
+    names = list(BINANCE20[:symbols])
+    names += [f"ALT{i:04d}USDT" for i in range(symbols - len(names))]
+    market = Market(names)
+    out = []
+    for i in range(frames):
+        now_ms = SYNTHETIC_START_MS + i * 1000
+        out.append(json.dumps([market.ticker(s, now_ms) for s in names],
+                              separators=(",", ":")))
+        market.step()
+    return out
+
+
+def shifted_capture(path: str) -> list:
+    """Captured frames with every "E" moved into the synthetic day."""
+    messages = []
+    for _, frame in read_capture(path):
+        try:
+            messages.append(json.loads(frame))
+        except ValueError:
+            continue  # not a ticker frame; nothing to replay
+    tickers = [dat for msg in messages for dat in as_ticker_list(msg) if "E" in dat]
+    times = [int(dat["E"]) for dat in tickers]
+    if times and max(times) - min(times) >= SYNTHETIC_SPAN_MS:
+        raise SystemExit(f"{path} spans more than a day; trim it before replaying")
+    offset = SYNTHETIC_START_MS - min(times, default=SYNTHETIC_START_MS)
+    for dat in tickers:
+        dat["E"] = int(dat["E"]) + offset
+    return [json.dumps(msg, separators=(",", ":")) for msg in messages]
+
+
+# Synthetic rows and everything the Processor's rollups derive from them
+SYNTHETIC_TABLES = (
+    ("coin_ticks", "event_time"),
+    ("coin_bars_1m", "bucket"),
+    ("coin_bars_1h", "bucket"),
+    ("coin_chart_data", "time"),
+)
+
+
+def cleanup_synthetic(conn):
+    with conn.cursor() as cur:
+        for table, column in SYNTHETIC_TABLES:
+            cur.execute(f"DELETE FROM public.{table} WHERE {column} < %s",
+                        (datetime(2000, 1, 2),))
+    conn.commit()
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(frames: list, decode: str, insert: str) -> dict:
+    processor = Processor(use_spool=False)
+    processor.parse_message = DECODERS[decode]
+    write = WRITERS[insert]
+    flushes = []
+    written = [0]
+
+    def timed_write(conn, rows):
+        started = time.perf_counter()
+        inserted = write(conn, rows)
+        flushes.append(time.perf_counter() - started)
+        written[0] += len(rows)
+        return inserted
+
+    processor.write_batch = timed_write
+    # Connect up front, so the first flush isn't timed with it
+    processor.reconnect(time.time())
+    started = time.perf_counter()
+    for frame in frames:
+        processor.handle_message(frame)
+    processor.flush()
+    elapsed = time.perf_counter() - started
+    if processor.conn is not None:
+        processor.conn.close()
+    return dict(
+        frames_per_sec=len(frames) / elapsed,
+        rows_per_sec=written[0] / elapsed,
+        rows=written[0],
+        flushes=len(flushes),
+        p50_ms=percentile(flushes, 0.50) * 1000,
+        p99_ms=percentile(flushes, 0.99) * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--capture", help="capture file; synthetic frames if omitted")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="synthetic frames (one per simulated second)")
+    parser.add_argument("--symbols", type=int, default=400,
+                        help="tickers per synthetic frame")
+    parser.add_argument("--decode", nargs="+", default=sorted(DECODERS))
+    parser.add_argument("--insert", nargs="+", default=sorted(WRITERS))
+    args = parser.parse_args()
+
+    # Load everything up front so file/gzip reads are not part of the timing
+    if args.capture:
+        frames = shifted_capture(args.capture)
+    else:
+        frames = synthetic_frames(args.frames, args.symbols)
+    print(f"{len(frames)} frames, {sum(map(len, frames)) / len(frames):,.0f} bytes/frame")
+    print(f"{'decode':<9}{'insert':<8}{'frames/sec':>11}{'rows/sec':>11}"
+          f"{'rows':>9}{'flushes':>9}{'p50 ms':>8}{'p99 ms':>8}{'rss MB':>8}")
+
+    for decode in args.decode:
+        for insert in args.insert:
+            r = run(frames, decode, insert)
+            conn = open_pg()
+            cleanup_synthetic(conn)
+            conn.close()
+            # Process high-water mark, so it only ever grows across runs
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{decode:<9}{insert:<8}{r['frames_per_sec']:>11,.0f}"
+                  f"{r['rows_per_sec']:>11,.0f}{r['rows']:>9,}{r['flushes']:>9}"
+                  f"{r['p50_ms']:>8.1f}{r['p99_ms']:>8.1f}{rss_mb:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Record raw websocket frames to a (gzip-compressed) capture file.
+
+Each line is `{"t": <receive epoch seconds>, "frame": "<raw frame>"}`; a
+`.gz` suffix enables compression. Lines that are bare frames (no envelope)
+are also accepted when reading, with timestamps synthesised at 1 s apart.
+
+    python capture.py --duration 600 --output captures/ticker.jsonl.gz
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import signal
+import time
+
+import websocket
+
+logger = logging.getLogger(__name__)
+
+
+def open_capture(path: str, mode: str = "rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_capture(path: str):
+    """Yield (receive_time, frame) pairs from a capture file."""
+    t = 0.0
+    with open_capture(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{"t"'):
+                record = json.loads(line)
+                t = record["t"]
+                yield t, record["frame"]
+            else:
+                t += 1.0
+                yield t, line
+
+
+class Recorder:
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open_capture(path, "at")
+        self.frames = 0
+
+    def write(self, frame: str, received: float = None):
+        self.file.write(json.dumps(
+            {"t": time.time() if received is None else received, "frame": frame},
+            separators=(",", ":")) + "\n")
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+
+def record(url: str, path: str, duration: float):
+    recorder = Recorder(path)
+    deadline = time.time() + duration if duration else None
+    stopping = []
+
+    def on_signal(signum, frame):
+        # run_forever() tears down on KeyboardInterrupt but does not re-raise
+        # it, so also leave a flag for the reconnect loop
+        stopping.append(signum)
+        raise KeyboardInterrupt
+
+    def on_message(ws, message):
+        recorder.write(message)
+        if deadline and time.time() >= deadline:
+            ws.close()
+
+    def on_error(ws, error):
+        logger.error("WebSocket error: %s", error)
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    try:
+        while not stopping and (deadline is None or time.time() < deadline):
+            ws = websocket.WebSocketApp(url, on_message=on_message,
+                                        on_error=on_error)
+            ws.run_forever(ping_interval=15, ping_timeout=10)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+    logger.info("Recorded %d frames to %s", recorder.frames, path)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=os.getenv(
+        "BINANCE_WS_URL", "wss://stream.binance.com:9443") + "/ws/!ticker@arr")
+    parser.add_argument("--output", default="captures/ticker.jsonl.gz")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="seconds to record, 0 = until interrupted")
+    args = parser.parse_args()
+    record(args.url, args.output, args.duration)
+
+
+if __name__ == "__main__":
+    main()
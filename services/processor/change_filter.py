@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from metrics import REGISTRY
+
+EPOCH = datetime(1970, 1, 1)
+
+# Row layout: symbol, event_time, price, price_change, price_change_percent,
+# high, low, volume, ingest_ts
+SYMBOL, EVENT_TIME, PRICE, PRICE_CHANGE, PRICE_CHANGE_PERCENT, HIGH, LOW, VOLUME = \
+    0, 1, 2, 3, 4, 5, 6, 7
+
+
+def event_seconds(value) -> float:
+    """Seconds since the epoch for a datetime or epoch-ms event_time."""
+    if isinstance(value, datetime):
+        return (value.replace(tzinfo=None) - EPOCH).total_seconds()
+    return value / 1000.0
+
+
+class ChangeFilter:
+    """Drops ticker snapshots whose stored values did not change.
+
+    The all-market stream resends every symbol each second whether or not it
+    traded. A row is kept when any stored field (price, 24h change and
+    change %, high, low, volume) differs from the last row kept for its
+    symbol, or when `heartbeat_secs` (> 0) of event time have passed since
+    then, so quiet symbols still get a periodic row. Every distinct value
+    is kept, but quiet symbols get fewer rows than busy ones, which
+    tick-weighted means (the bars' price_sum / tick_count) reflect.
+    """
+
+    def __init__(self, heartbeat_secs: float = 60.0):
+        self.heartbeat_secs = heartbeat_secs
+        self.last = {}
+        self.kept = REGISTRY.counter(
+            "change_filter_kept_total", "Rows kept by the change filter")
+        self.suppressed = REGISTRY.counter(
+            "change_filter_suppressed_total", "Unchanged rows dropped")
+
+    def filter(self, rows: list) -> list:
+        kept = []
+        last = self.last
+        heartbeat = self.heartbeat_secs
+        for row in rows:
+            key = (row[PRICE], row[PRICE_CHANGE], row[PRICE_CHANGE_PERCENT],
+                   row[HIGH], row[LOW], row[VOLUME])
+            seen = last.get(row[SYMBOL])
+            ts = event_seconds(row[EVENT_TIME])
+            if seen is not None and seen[0] == key and \
+                    not (heartbeat > 0 and ts - seen[1] >= heartbeat):
+                continue
+            last[row[SYMBOL]] = (key, ts)
+            kept.append(row)
+        self.kept.inc(len(kept))
+        self.suppressed.inc(len(rows) - len(kept))
+        return kept
@@ -0,0 +1,249 @@
+"""
+Switch coin_ticks' price/volume columns between NUMERIC and double precision.
+
+NUMERIC(38,8) is exact but variable-length, aggregates in software and
+reaches Python as Decimal. double precision is 8 bytes fixed, aggregates
+natively and arrives as float; its 15-16 significant digits cover Binance's
+8-decimal prices. See bench_compact.py for the size / speed difference.
+
+The conversion runs next to the live table: it builds coin_ticks_new with
+the same daily partitions, copies one partition per transaction while the
+processor keeps writing, then copies the rows that arrived meanwhile and
+swaps the names under a short write lock (views on coin_ticks are
+recreated). The previous table stays as coin_ticks_old until drop-old.
+Re-running migrate after an interruption resumes it.
+
+    python compact_ticks.py status
+    python compact_ticks.py migrate --type double
+    python compact_ticks.py migrate --type numeric   # back to the original
+    python compact_ticks.py drop-old
+"""
+
+import argparse
+import logging
+import time
+from datetime import timedelta
+
+from db import open_pg
+
+logger = logging.getLogger(__name__)
+
+TABLE = "coin_ticks"
+NEW = "coin_ticks_new"
+OLD = "coin_ticks_old"
+
+COLUMNS = ("symbol", "event_time", "price", "price_change", "price_change_percent",
+           "high", "low", "volume", "ingest_ts")
+
+COLUMN_TYPES = {
+    "double": dict.fromkeys(
+        ("price", "price_change", "price_change_percent", "high", "low", "volume"),
+        "double precision"),
+    "numeric": {
+        "price": "numeric(38,8)",
+        "price_change": "numeric(38,8)",
+        "price_change_percent": "numeric(9,4)",
+        "high": "numeric(38,8)",
+        "low": "numeric(38,8)",
+        "volume": "numeric(38,8)",
+    },
+}
+
+# Same lock coin_ticks_maintain_partitions() takes (init-scripts/004)
+MAINTENANCE_LOCK = "SELECT pg_advisory_xact_lock(hashtext('coin_ticks_maintain_partitions'))"
+
+
+def exists(cur, table: str) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"public.{table}",))
+    return cur.fetchone()[0]
+
+
+def column_types(cur, table: str) -> dict:
+    cur.execute("""
+        SELECT attname, format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+    """, (f"public.{table}",))
+    return dict(cur.fetchall())
+
+
+def partitions(cur, table: str) -> dict:
+    """Partition name suffix (e.g. '_p20240101', '_default') -> bound clause."""
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+    """, (f"public.{table}",))
+    return {name[len(table):]: bound for name, bound in cur.fetchall()}
+
+
+def schema_kind(types: dict) -> str:
+    for kind, wanted in COLUMN_TYPES.items():
+        if all(types.get(col) == t for col, t in wanted.items()):
+            return kind
+    return "mixed"
+
+
+def sync_partitions(cur):
+    """Give coin_ticks_new every partition coin_ticks has, and no others."""
+    old = partitions(cur, TABLE)
+    new = partitions(cur, NEW)
+    for suffix in sorted(set(new) - set(old)):
+        cur.execute(f"DROP TABLE public.{NEW}{suffix}")
+    for suffix in sorted(set(old) - set(new)):
+        cur.execute(f"CREATE TABLE public.{NEW}{suffix} PARTITION OF public.{NEW} {old[suffix]}")
+    return sorted(old)
+
+
+def create_new(conn, kind: str):
+    with conn.cursor() as cur:
+        if exists(cur, NEW):
+            if schema_kind(column_types(cur, NEW)) != kind:
+                raise SystemExit(f"{NEW} exists with a different schema; drop it first")
+            logger.info("Resuming with existing %s", NEW)
+        else:
+            cur.execute(f"""
+                CREATE TABLE public.{NEW} (
+                    LIKE public.{TABLE} INCLUDING DEFAULTS,
+                    PRIMARY KEY (symbol, event_time)
+                ) PARTITION BY RANGE (event_time)
+            """)
+            for col, type_ in COLUMN_TYPES[kind].items():
+                cur.execute(f"ALTER TABLE public.{NEW} ALTER COLUMN {col} TYPE {type_}")
+        suffixes = sync_partitions(cur)
+    conn.commit()
+    return suffixes
+
+
+def copy_rows(cur, suffix: str = "", since=None) -> int:
+    """Copy a partition (or, with no suffix, the whole table) into the new one."""
+    # The casts are implicit assignment casts in both directions
+    names = ", ".join(COLUMNS)
+    where = "WHERE event_time >= %s" if since else ""
+    cur.execute(f"""
+        INSERT INTO public.{NEW}{suffix} ({names})
+        SELECT {names} FROM public.{TABLE}{suffix} {where}
+        ON CONFLICT (symbol, event_time) DO NOTHING
+    """, (since,) if since else None)
+    return cur.rowcount
+
+
+def rename_table(cur, table: str, new_name: str):
+    cur.execute(f"ALTER TABLE public.{table} RENAME TO {new_name}")
+    # Keep index names following the table so later partitions don't collide
+    cur.execute("""
+        SELECT i.indexrelid::regclass::text
+        FROM pg_index i WHERE i.indrelid = %s::regclass AND i.indisprimary
+    """, (f"public.{new_name}",))
+    for index, in cur.fetchall():
+        cur.execute(f"ALTER INDEX {index} RENAME TO {new_name}_pkey")
+
+
+def dependent_views(cur) -> list:
+    cur.execute("""
+        SELECT DISTINCT c.oid::regclass::text, pg_get_viewdef(c.oid)
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        JOIN pg_class c ON c.oid = r.ev_class
+        WHERE d.refobjid = %s::regclass AND c.relkind = 'v'
+    """, (f"public.{TABLE}",))
+    return cur.fetchall()
+
+
+def swap(conn, since):
+    """Copy what arrived since `since` and swap names, under a write lock."""
+    with conn.cursor() as cur:
+        cur.execute(MAINTENANCE_LOCK)
+        # Readers keep going; the processor's inserts wait for the commit
+        cur.execute(f"LOCK TABLE public.{TABLE} IN EXCLUSIVE MODE")
+        started = time.perf_counter()
+        suffixes = sync_partitions(cur)
+        # Through the parents, so partition pruning skips the older days
+        caught_up = copy_rows(cur, since=since)
+
+        views = dependent_views(cur)
+        for name, _ in views:
+            cur.execute(f"DROP VIEW {name}")
+        rename_table(cur, TABLE, OLD)
+        for suffix in suffixes:
+            rename_table(cur, TABLE + suffix, OLD + suffix)
+        rename_table(cur, NEW, TABLE)
+        for suffix in suffixes:
+            rename_table(cur, NEW + suffix, TABLE + suffix)
+        for name, definition in views:
+            cur.execute(f"CREATE VIEW {name} AS {definition}")
+    conn.commit()
+    logger.info("Swapped in %s rows caught up, writes blocked for %.2fs",
+                caught_up, time.perf_counter() - started)
+
+
+def migrate(conn, kind: str, lag: timedelta):
+    with conn.cursor() as cur:
+        if schema_kind(column_types(cur, TABLE)) == kind:
+            logger.info("%s already uses %s columns", TABLE, kind)
+            return
+        if exists(cur, OLD):
+            raise SystemExit(f"{OLD} still exists; run drop-old first")
+        cur.execute("SELECT (NOW() AT TIME ZONE 'UTC')")
+        # Rows older than this that arrive during the copy are not caught up
+        since = cur.fetchone()[0] - lag
+    conn.commit()
+
+    # Oldest first, so the busy current partitions are copied last
+    for suffix in create_new(conn, kind):
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            rows = copy_rows(cur, suffix)
+        conn.commit()
+        logger.info("Copied %s%s: %s rows in %.1fs", TABLE, suffix, rows,
+                    time.perf_counter() - started)
+    swap(conn, since)
+    logger.info("%s now uses %s columns; previous table kept as %s", TABLE, kind, OLD)
+
+
+def status(conn):
+    with conn.cursor() as cur:
+        for table in (TABLE, NEW, OLD):
+            if not exists(cur, table):
+                continue
+            cur.execute("""
+                SELECT count(*), pg_size_pretty(sum(pg_total_relation_size(inhrelid)))
+                FROM pg_inherits WHERE inhparent = %s::regclass
+            """, (f"public.{table}",))
+            count, size = cur.fetchone()
+            kind = schema_kind(column_types(cur, table))
+            print(f"{table:<16}{kind:<9}{count:>4} partitions {size or '0 bytes':>10}")
+    conn.rollback()
+
+
+def drop_old(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS public.{OLD}")
+    conn.commit()
+    logger.info("Dropped %s", OLD)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("status", "migrate", "drop-old"))
+    parser.add_argument("--type", choices=sorted(COLUMN_TYPES), default="double")
+    parser.add_argument("--lag-minutes", type=float, default=60,
+                        help="how late rows written during the copy may be")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    conn = open_pg()
+    try:
+        if args.command == "status":
+            status(conn)
+        elif args.command == "migrate":
+            migrate(conn, args.type, timedelta(minutes=args.lag_minutes))
+        else:
+            drop_old(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,7 @@
-BINANCE20 = [
-    "BTCUSDT",    # Bitcoin
-    "ETHUSDT",    # Ethereum
-    "BNBUSDT",    # Binance Coin
-    "XRPUSDT",    # Ripple
-    "SOLUSDT",    # Solana
-    "DOGEUSDT",   # Dogecoin
-    "ADAUSDT",    # Cardano
-    "TRXUSDT",    # Tron
-    "AVAXUSDT",   # Avalanche
-    "LINKUSDT",   # Chainlink
-    "DOTUSDT",    # Polkadot
-    "LTCUSDT",    # Litecoin
-    "MATICUSDT",  # Polygon
-    "SHIBUSDT",   # Shiba Inu
-    "XLMUSDT",    # Stellar
-    "BCHUSDT",    # Bitcoin Cash
-    "UNIUSDT",    # Uniswap
-    "ATOMUSDT",   # Cosmos
-    "NEARUSDT",   # NEAR Protocol
-    "PEPEUSDT"    # Pepe
-]
+import os
+import sys
+
+# The symbol list lives in services/common; images copy it next to the code
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+
+from symbols import BINANCE20, SYMBOLS, load_symbols  # noqa: E402,F401
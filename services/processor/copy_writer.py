@@ -0,0 +1,110 @@
+import io
+import struct
+import weakref
+from datetime import datetime
+
+# Binary COPY framing (https://www.postgresql.org/docs/current/sql-copy.html)
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+# Postgres timestamps are microseconds since 2000-01-01
+PG_EPOCH = datetime(2000, 1, 1)
+PG_EPOCH_MS = 946684800000
+
+STAGING_TABLE = "coin_ticks_staging"
+
+# Numeric columns are staged as text so rows can be encoded without building
+# the base-10000 numeric wire format in Python; the merge casts them back.
+STAGING_COLUMNS = (
+    ("symbol", "text"),
+    ("event_time", "timestamp"),
+    ("price", "text"),
+    ("price_change", "text"),
+    ("price_change_percent", "text"),
+    ("high", "text"),
+    ("low", "text"),
+    ("volume", "text"),
+    ("ingest_ts", "timestamp"),
+)
+
+_pack_len = struct.Struct("!i").pack
+_pack_ts = struct.Struct("!iq").pack
+_pack_ncols = struct.Struct("!h").pack(len(STAGING_COLUMNS))
+_NULL = _pack_len(-1)
+
+_staged = weakref.WeakSet()
+
+
+def encode_text(value) -> bytes:
+    if value is None:
+        return _NULL
+    data = str(value).encode()
+    return _pack_len(len(data)) + data
+
+
+def encode_timestamp(value) -> bytes:
+    if value is None:
+        return _NULL
+    if isinstance(value, datetime):
+        delta = value.replace(tzinfo=None) - PG_EPOCH
+        micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    else:
+        # Epoch milliseconds
+        micros = (int(value) - PG_EPOCH_MS) * 1000
+    return _pack_ts(8, micros)
+
+
+ENCODERS = tuple(
+    encode_timestamp if kind == "timestamp" else encode_text
+    for _, kind in STAGING_COLUMNS
+)
+
+
+def encode_rows(rows) -> bytes:
+    parts = [PGCOPY_HEADER]
+    append = parts.append
+    for row in rows:
+        append(_pack_ncols)
+        for enc, value in zip(ENCODERS, row):
+            append(enc(value))
+    append(PGCOPY_TRAILER)
+    return b"".join(parts)
+
+
+def ensure_staging(conn):
+    if conn in _staged:
+        return
+    columns = ", ".join(f"{name} {kind}" for name, kind in STAGING_COLUMNS)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ({columns}) "
+            "ON COMMIT DELETE ROWS"
+        )
+    conn.commit()
+    _staged.add(conn)
+
+
+def insert_batch_copy(conn, rows) -> int:
+    if not rows:
+        return 0
+
+    ensure_staging(conn)
+    names = ", ".join(name for name, _ in STAGING_COLUMNS)
+    merge = f"""
+        INSERT INTO public.coin_ticks ({names})
+        SELECT symbol, event_time, price::numeric, price_change::numeric,
+               price_change_percent::numeric, high::numeric, low::numeric,
+               volume::numeric, ingest_ts
+        FROM {STAGING_TABLE}
+        ON CONFLICT (symbol, event_time) DO NOTHING
+    """
+
+    with conn.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {STAGING_TABLE} ({names}) FROM STDIN WITH (FORMAT binary)",
+            io.BytesIO(encode_rows(rows)),
+        )
+        cur.execute(merge)
+        inserted = cur.rowcount
+    conn.commit()
+    return inserted
@@ -0,0 +1,31 @@
+"""
+Postgres connection settings and the retrying connect shared by the
+processor, compact_ticks.py and the benchmarks.
+"""
+
+import logging
+import os
+
+import psycopg2
+from metrics import REGISTRY
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+PG_CONN_INFO = dict(
+    host=os.getenv("POSTGRES_HOST"),
+    port=os.getenv("POSTGRES_PORT"),
+    dbname=os.getenv("POSTGRES_DB"),
+    user=os.getenv("POSTGRES_USER"),
+    password=os.getenv("POSTGRES_PASSWORD")
+)
+
+PG_CONNECT_ATTEMPTS = REGISTRY.counter(
+    "pg_connect_attempts_total", "Postgres connection attempts")
+
+
+@retry(stop=stop_after_attempt(5), wait=wait_exponential(min=1, max=30))
+def open_pg():
+    logger.info("Connecting to Postgres...")
+    PG_CONNECT_ATTEMPTS.inc()
+    return psycopg2.connect(**PG_CONN_INFO)
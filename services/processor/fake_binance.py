@@ -0,0 +1,226 @@
+"""
+Local stand-in for the Binance market-data endpoints, for offline testing.
+
+Serves, without TLS:
+  ws://HOST:PORT/ws/!ticker@arr                      all symbols as one array
+  ws://HOST:PORT/ws/<sym>@ticker                     one symbol
+  ws://HOST:PORT/stream?streams=<a>@ticker/<b>@ticker  combined-stream envelopes
+  http://HOST:PORT/api/v3/ticker/24hr?symbols=[...]  REST snapshot (backfill)
+
+    python fake_binance.py --port 9443 --symbols 300 --drop-after 30
+    BINANCE_WS_URL=ws://localhost:9443 BINANCE_REST_URL=http://localhost:9443 \\
+        SHARDS=4 python app.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socketserver
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from configs import BINANCE20
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class Market:
+    """Random-walk 24h ticker state per symbol."""
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.lock = threading.Lock()
+        self.state = {}
+        for sym in self.symbols:
+            price = random.uniform(0.5, 50000)
+            self.state[sym] = dict(open=price, price=price, high=price,
+                                   low=price, volume=0.0)
+
+    def step(self):
+        with self.lock:
+            for st in self.state.values():
+                st["price"] *= 1 + random.gauss(0, 0.0005)
+                st["high"] = max(st["high"], st["price"])
+                st["low"] = min(st["low"], st["price"])
+                st["volume"] += random.uniform(0, 10)
+
+    def ticker(self, sym: str, now_ms: int) -> dict:
+        st = self.state[sym]
+        change = st["price"] - st["open"]
+        return {
+            "e": "24hrTicker", "E": now_ms, "s": sym,
+            "p": f"{change:.8f}", "P": f"{change / st['open'] * 100:.3f}",
+            "c": f"{st['price']:.8f}", "o": f"{st['open']:.8f}",
+            "h": f"{st['high']:.8f}", "l": f"{st['low']:.8f}",
+            "v": f"{st['volume']:.8f}", "C": now_ms,
+        }
+
+    def rest_ticker(self, sym: str, now_ms: int) -> dict:
+        t = self.ticker(sym, now_ms)
+        return {
+            "symbol": sym, "priceChange": t["p"], "priceChangePercent": t["P"],
+            "lastPrice": t["c"], "openPrice": t["o"], "highPrice": t["h"],
+            "lowPrice": t["l"], "volume": t["v"], "closeTime": now_ms,
+        }
+
+
+def ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class Handler(socketserver.StreamRequestHandler):
+    server: "FakeBinanceServer"
+
+    def handle(self):
+        request_line = self.rfile.readline().decode().strip()
+        if not request_line:
+            return
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        url = urlparse(request_line.split()[1])
+
+        if headers.get("upgrade", "").lower() == "websocket":
+            self.serve_websocket(url, headers["sec-websocket-key"])
+        else:
+            self.serve_rest(url)
+
+    def serve_rest(self, url):
+        market = self.server.market
+        if url.path != "/api/v3/ticker/24hr":
+            self.wfile.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            return
+        query = parse_qs(url.query)
+        symbols = json.loads(query["symbols"][0]) if "symbols" in query \
+            else market.symbols
+        now_ms = int(time.time() * 1000)
+        body = json.dumps([market.rest_ticker(sym, now_ms) for sym in symbols
+                           if sym in market.state]).encode()
+        self.wfile.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body)
+
+    def accept_websocket(self, key):
+        accept = base64.b64encode(
+            hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.wfile.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+        self.send_lock = threading.Lock()
+        self.closed = threading.Event()
+        threading.Thread(target=self.read_frames, daemon=True).start()
+
+    def serve_websocket(self, url, key):
+        self.accept_websocket(key)
+        combined = url.path == "/stream"
+        if combined:
+            streams = parse_qs(url.query)["streams"][0].split("/")
+        else:
+            streams = [url.path.rsplit("/", 1)[-1]]
+        all_market = streams == ["!ticker@arr"]
+        symbols = [s.split("@")[0].upper() for s in streams if not all_market]
+
+        market = self.server.market
+        drop_at = time.time() + self.server.drop_after if self.server.drop_after else None
+        while not self.closed.is_set():
+            now_ms = int(time.time() * 1000)
+            if all_market:
+                frames = [json.dumps([market.ticker(s, now_ms) for s in market.symbols],
+                                     separators=(",", ":"))]
+            else:
+                frames = [json.dumps(
+                    {"stream": f"{s.lower()}@ticker", "data": market.ticker(s, now_ms)}
+                    if combined else market.ticker(s, now_ms),
+                    separators=(",", ":")) for s in symbols if s in market.state]
+            try:
+                for frame in frames:
+                    self.send(ws_frame(frame.encode()))
+            except OSError:
+                break
+            if drop_at and time.time() >= drop_at:
+                break
+            self.closed.wait(self.server.interval)
+        self.closed.set()
+
+    def send(self, data: bytes):
+        with self.send_lock:
+            self.wfile.write(data)
+
+    def read_frames(self):
+        try:
+            while True:
+                b1, b2 = struct.unpack("!BB", self.rfile.read(2))
+                opcode, n = b1 & 0x0F, b2 & 0x7F
+                if n == 126:
+                    n, = struct.unpack("!H", self.rfile.read(2))
+                elif n == 127:
+                    n, = struct.unpack("!Q", self.rfile.read(8))
+                mask = self.rfile.read(4) if b2 & 0x80 else b"\0\0\0\0"
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(n)))
+                if opcode == 0x8:
+                    self.send(ws_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    self.send(ws_frame(payload, opcode=0xA))
+        except (OSError, struct.error):
+            pass
+        self.closed.set()
+
+
+class FakeBinanceServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, market: Market, interval: float = 1.0,
+                 drop_after: float = 0):
+        super().__init__(address, Handler)
+        self.market = market
+        self.interval = interval
+        self.drop_after = drop_after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--symbols", type=int, default=len(BINANCE20),
+                        help="number of symbols (BINANCE20 first, then synthetic)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between snapshots")
+    parser.add_argument("--drop-after", type=float, default=0,
+                        help="close each websocket after N seconds (tests reconnect)")
+    args = parser.parse_args()
+
+    symbols = list(BINANCE20[:args.symbols])
+    symbols += [f"ALT{i:04d}USDT" for i in range(args.symbols - len(symbols))]
+    market = Market(symbols)
+    server = FakeBinanceServer((args.host, args.port), market, args.interval,
+                               args.drop_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Fake Binance on ws://{args.host}:{args.port} with {len(symbols)} symbols")
+    try:
+        while True:
+            time.sleep(args.interval)
+            market.step()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+
+from configs import SYMBOLS
+from metrics import REGISTRY
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_SET = frozenset(SYMBOLS)
+
+TICKS_SKIPPED = REGISTRY.counter(
+    "ticks_skipped_total", "Tickers of wanted symbols skipped as malformed")
+
+
+def as_ticker_list(data) -> list:
+    """Normalise `!ticker@arr` arrays and combined-stream envelopes to a list."""
+    if isinstance(data, dict):
+        data = data.get("data", data)
+    if isinstance(data, dict):
+        return [data]
+    return data if isinstance(data, list) else []
+
+
+@lru_cache(maxsize=8)
+def symbol_pattern(symbols: frozenset):
+    alternatives = "|".join(re.escape(sym) for sym in sorted(symbols))
+    # Compact (as Binance sends it) or with whitespace around the colon
+    return re.compile(f'"s"\\s*:\\s*"({alternatives})"')
+
+
+def select_tickers(message, symbols: frozenset = SYMBOL_SET):
+    """Return the decoded tickers of a frame whose symbol is in `symbols`.
+
+    Binance sends `!ticker@arr` as a compact array of flat objects, so wanted
+    symbols are located with one regex scan and only their objects decoded.
+    Anything that does not look like that, including a slice that is not
+    the flat object carrying the matched symbol, falls back to a full decode.
+    """
+    if isinstance(message, (bytes, bytearray)):
+        message = message.decode()
+    if message.startswith("[{") and message.endswith("}]"):
+        try:
+            selected = []
+            for match in symbol_pattern(symbols).finditer(message):
+                start = message.rfind("{", 0, match.start())
+                end = message.find("}", match.end()) + 1
+                # A top-level element of the array, not an object nested in one
+                if message[start - 1] not in "[," or message[end] not in ",]":
+                    raise ValueError("ticker slice is not an array element")
+                dat = loads(message[start:end])
+                if not isinstance(dat, dict) or dat.get("s") != match.group(1):
+                    raise ValueError("ticker slice does not match its symbol")
+                selected.append(dat)
+            return selected
+        except ValueError:
+            pass
+    return [dat for dat in as_ticker_list(loads(message))
+            if isinstance(dat, dict) and dat.get("s") in symbols]
+
+
+def parse_fast(message, symbols: frozenset = SYMBOL_SET) -> list:
+    """Decode a `!ticker@arr` frame without Decimal/datetime objects.
+
+    Rows carry prices as floats and `event_time`/`ingest_ts` as epoch
+    milliseconds; both writers turn those into timestamps in Postgres.
+    """
+    ingest_ms = int(time.time() * 1000)
+    rows = []
+    append = rows.append
+    for dat in select_tickers(message, symbols):
+        try:
+            append((
+                dat["s"], int(dat["E"]), float(dat["c"]), float(dat["p"]),
+                float(dat["P"]), float(dat["h"]), float(dat["l"]),
+                float(dat["v"]), ingest_ms
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            TICKS_SKIPPED.inc()
+            logger.warning("Skip bad message: %s", e)
+    return rows
@@ -0,0 +1,70 @@
+from metrics import REGISTRY
+
+
+class FlushScheduler:
+    """Decides when the writer flushes and how many rows go in a batch.
+
+    After every flush the batch size is nudged towards the size that would
+    have committed in `target_commit_secs`, and the interval is set to the
+    time the current ingest rate needs to fill one batch, clamped to
+    [`min_interval`, `max_interval`]. `max_interval` therefore bounds data
+    freshness when the stream is quiet, while a busy stream flushes on size.
+    Setting `min_batch == max_batch` and `min_interval == max_interval`
+    gives the old fixed BATCH_SIZE/FLUSH_SECS behaviour.
+    """
+
+    def __init__(self, batch_size: int, max_interval: float,
+                 target_commit_secs: float = 0.2, min_batch: int = 50,
+                 max_batch: int = 10000, min_interval: float = 0.1,
+                 smoothing: float = 0.3):
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.target_commit_secs = target_commit_secs
+        self.smoothing = smoothing
+        self.batch_size = self._clamp(batch_size, min_batch, max_batch)
+        self.interval = max_interval
+        self.rows_per_sec = 0.0
+
+        self.batch_size_gauge = REGISTRY.gauge(
+            "flush_batch_size", "Current adaptive batch size (rows)")
+        self.interval_gauge = REGISTRY.gauge(
+            "flush_interval_seconds", "Current adaptive flush interval")
+        self.commit_gauge = REGISTRY.gauge(
+            "flush_commit_seconds", "Duration of the last batch commit")
+        self._publish()
+
+    @staticmethod
+    def _clamp(value, low, high):
+        return max(low, min(high, value))
+
+    def _smooth(self, old: float, new: float) -> float:
+        return old + self.smoothing * (new - old)
+
+    def _publish(self):
+        self.batch_size_gauge.set(self.batch_size)
+        self.interval_gauge.set(self.interval)
+
+    def due(self, buffered: int, last_flush: float, now: float) -> bool:
+        return buffered >= self.batch_size or now >= last_flush + self.interval
+
+    def next_flush_at(self, last_flush: float) -> float:
+        return last_flush + self.interval
+
+    def observe(self, rows: int, commit_secs: float, elapsed: float):
+        """Record a flush of `rows` that took `commit_secs`, `elapsed` after the previous one."""
+        self.commit_gauge.set(commit_secs)
+        if elapsed > 0:
+            self.rows_per_sec = self._smooth(self.rows_per_sec, rows / elapsed)
+        if rows and commit_secs > 0:
+            ideal = rows * self.target_commit_secs / commit_secs
+            self.batch_size = int(self._clamp(
+                self._smooth(self.batch_size, ideal),
+                self.min_batch, self.max_batch))
+        if self.rows_per_sec > 0:
+            fill_secs = self.batch_size / self.rows_per_sec
+        else:
+            fill_secs = self.max_interval
+        self.interval = self._clamp(fill_secs, self.min_interval, self.max_interval)
+        self._publish()
@@ -0,0 +1,87 @@
+import logging
+import time
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+def run_kafka_consumer(processor, bootstrap_servers: str, topic: str,
+                       group_id: str, max_poll_records: int = 5000):
+    """Consume ticker records from the ingestor topic as part of a group.
+
+    Offsets are committed only after the rows they produced are committed to
+    Postgres. If a write fails the buffer is discarded and every partition is
+    rewound to its last committed offset, so Kafka (not a local spool) holds
+    the backlog and a crashed consumer's partitions are replayed by the group.
+    """
+    # Only needed for SOURCE=kafka
+    from kafka import ConsumerRebalanceListener, KafkaConsumer
+
+    consumed = REGISTRY.counter(
+        "kafka_records_consumed_total", "Ticker records consumed from Kafka")
+    commits = REGISTRY.counter(
+        "kafka_offset_commits_total", "Offset commits after a Postgres write")
+    rewinds = REGISTRY.counter(
+        "kafka_rewinds_total", "Rewinds to committed offsets after a failed write")
+
+    consumer = KafkaConsumer(
+        bootstrap_servers=bootstrap_servers,
+        group_id=group_id,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+        max_poll_records=max_poll_records,
+    )
+
+    def reset_filter():
+        # Symbols may move between consumers, so forget what was "last written"
+        if processor.change_filter is not None:
+            processor.change_filter.last.clear()
+
+    def rewind(partitions):
+        processor.buffer.clear()
+        reset_filter()
+        for tp in partitions:
+            offset = consumer.committed(tp)
+            if offset is None:
+                consumer.seek_to_beginning(tp)
+            else:
+                consumer.seek(tp, offset)
+        rewinds.inc()
+
+    def flush_and_commit() -> bool:
+        if processor.flush():
+            consumer.commit()
+            commits.inc()
+            return True
+        return False
+
+    class Rebalance(ConsumerRebalanceListener):
+        def on_partitions_revoked(self, revoked):
+            # Hand partitions over with everything consumed so far committed
+            if revoked and not flush_and_commit():
+                processor.buffer.clear()
+            reset_filter()
+
+        def on_partitions_assigned(self, assigned):
+            logger.info("Assigned partitions: %s",
+                        sorted(tp.partition for tp in assigned))
+
+    consumer.subscribe([topic], listener=Rebalance())
+    logger.info("Consuming %s as group %s", topic, group_id)
+
+    while True:
+        timeout_ms = max(0, int((processor.next_flush_at() - time.time()) * 1000))
+        batches = consumer.poll(timeout_ms=timeout_ms)
+        values = [record.value for records in batches.values() for record in records]
+        if values:
+            consumed.inc(len(values))
+            processor.add_rows(
+                processor.parse(b"[" + b",".join(values) + b"]"))
+
+        if not processor.scheduler.due(len(processor.buffer),
+                                       processor.last_flush, time.time()):
+            continue
+        if not flush_and_commit():
+            rewind(consumer.assignment())
+            time.sleep(max(0.0, processor.reconnect_at - time.time()))
@@ -0,0 +1,157 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; wide enough for a sub-millisecond parse and a multi-second commit
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1):
+        with self._lock:
+            self.value += n
+
+
+class Gauge:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def observe_many(self, values):
+        """Observe a batch under one lock (e.g. a latency per written row)."""
+        buckets, counts = self.buckets, self.counts
+        index = bisect.bisect_left
+        with self._lock:
+            for value in values:
+                counts[index(buckets, value)] += 1
+                self.sum += value
+                self.count += 1
+
+
+class Registry:
+    def __init__(self, namespace: str = ""):
+        # Prefixed to every metric name, e.g. "processor" -> processor_rows_inserted_total
+        self.prefix = f"{namespace}_" if namespace else ""
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str):
+        name = self.prefix + name
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help)
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "") -> Histogram:
+        return self._get(Histogram, name, help)
+
+    def snapshot(self) -> dict:
+        # Histograms log their mean
+        return {name: m.value for name, m in self.metrics.items()}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for name, m in sorted(self.metrics.items()):
+            if m.help:
+                lines.append(f"# HELP {name} {m.help}")
+            if isinstance(m, Histogram):
+                lines.append(f"# TYPE {name} histogram")
+                with m._lock:
+                    counts, total, count = list(m.counts), m.sum, m.count
+                cumulative = 0
+                for bound, n in zip(m.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum {total:g}")
+                lines.append(f"{name}_count {count}")
+            else:
+                kind = "counter" if isinstance(m, Counter) else "gauge"
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {m.value:g}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry("processor")
+
+
+def start_log_reporter(logger, interval: float, registry: Registry = REGISTRY):
+    def loop():
+        while True:
+            time.sleep(interval)
+            logger.info("metrics %s", " ".join(
+                f"{name}={value:g}" for name, value in registry.snapshot().items()
+            ))
+
+    thread = threading.Thread(target=loop, name="metrics-log", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_http_server(port: int, registry: Registry = REGISTRY,
+                      host: str = "0.0.0.0"):
+    """Serve `registry` on http://host:port/metrics for Prometheus to scrape."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http",
+                              daemon=True)
+    thread.start()
+    return server
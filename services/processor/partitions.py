@@ -0,0 +1,72 @@
+import logging
+import threading
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MAINTAIN_SQL = "SELECT * FROM public.coin_ticks_maintain_partitions(%s, %s, %s)"
+
+
+def maintain_partitions(conn, days_ahead: int = 7, retention_days: int = 0,
+                        drop_expired: bool = True) -> list:
+    """Run one maintenance pass; returns the actions taken (see init-scripts/004)."""
+    with conn.cursor() as cur:
+        cur.execute(MAINTAIN_SQL, (days_ahead, retention_days, drop_expired))
+        actions = [action for action, in cur.fetchall()]
+    conn.commit()
+    return actions
+
+
+class PartitionMaintainer:
+    """Background thread that keeps coin_ticks' daily partitions in shape.
+
+    Every `interval` seconds it creates partitions `days_ahead` days out,
+    gives late rows in the default partition their own day, and drops (or
+    detaches) days older than `retention_days` (0 = keep everything). It
+    uses its own short-lived connection so it never touches the writer's.
+    """
+
+    def __init__(self, connect, interval: float = 3600.0, days_ahead: int = 7,
+                 retention_days: int = 0, drop_expired: bool = True):
+        self.connect = connect
+        self.interval = interval
+        self.days_ahead = days_ahead
+        self.retention_days = retention_days
+        self.drop_expired = drop_expired
+        self._stop = threading.Event()
+        self.runs = REGISTRY.counter(
+            "partition_maintenance_runs_total", "Partition maintenance passes")
+        self.failures = REGISTRY.counter(
+            "partition_maintenance_failures_total", "Failed maintenance passes")
+
+    def run_once(self):
+        conn = self.connect()
+        try:
+            for action in maintain_partitions(conn, self.days_ahead,
+                                              self.retention_days,
+                                              self.drop_expired):
+                # A day that failed to attach is retried on the next pass
+                level = logging.WARNING if action.startswith("failed") else logging.INFO
+                logger.log(level, "Partition maintenance: %s", action)
+        finally:
+            conn.close()
+        self.runs.inc()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self.failures.inc()
+                logger.error("Partition maintenance failed: %s", e)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        thread = threading.Thread(target=self._loop, name="partitions", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# What the receive thread does when the frame queue is full:
+#   drop_oldest - discard the oldest queued frame (ticker snapshots supersede
+#                 each other, so the newest data is kept)
+#   drop_newest - discard the incoming frame
+#   block       - wait for room; stalls the socket and can miss pings
+BACKPRESSURE_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class Pipeline:
+    """Receive -> parse -> write stages connected by bounded queues.
+
+    The websocket thread only calls `submit`. A parser thread turns frames into
+    rows and a writer thread owns the Postgres connection, so slow commits or
+    reconnect backoff never block the socket.
+    """
+
+    def __init__(self, processor, frame_queue_size: int = 1000,
+                 row_queue_size: int = 1000, policy: str = "drop_oldest"):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.processor = processor
+        self.policy = policy
+        self.frames = queue.Queue(maxsize=frame_queue_size)
+        self.rows = queue.Queue(maxsize=row_queue_size)
+        self._stop_parser = threading.Event()
+        self._stop_writer = threading.Event()
+        self._threads = []
+
+        self.frames_received = REGISTRY.counter(
+            "frames_received_total", "Websocket frames received")
+        self.frames_dropped = REGISTRY.counter(
+            "frames_dropped_total", "Frames dropped by the backpressure policy")
+        self.frame_queue_depth = REGISTRY.gauge(
+            "frame_queue_depth", "Frames waiting to be parsed")
+        self.frame_queue_lag = REGISTRY.gauge(
+            "frame_queue_lag_seconds", "Time the last parsed frame spent queued")
+        self.row_queue_depth = REGISTRY.gauge(
+            "row_queue_depth", "Parsed row batches waiting for the writer")
+        self.row_queue_lag = REGISTRY.gauge(
+            "row_queue_lag_seconds", "Receive-to-buffer time of the last row batch")
+
+    def start(self):
+        for name, target in (("parser", self._parse_loop),
+                             ("writer", self._write_loop)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        # Drain in order so rows parsed during shutdown still get written
+        for event, thread in zip((self._stop_parser, self._stop_writer),
+                                 self._threads):
+            event.set()
+            thread.join(timeout)
+
+    def submit(self, message: str):
+        item = (time.monotonic(), message)
+        self.frames_received.inc()
+        if self.policy == "block":
+            self.frames.put(item)
+            return
+        while True:
+            try:
+                self.frames.put_nowait(item)
+                return
+            except queue.Full:
+                if self.policy == "drop_newest":
+                    self.frames_dropped.inc()
+                    return
+            try:
+                self.frames.get_nowait()
+                self.frames_dropped.inc()
+            except queue.Empty:
+                pass
+
+    def submit_rows(self, received: float, rows: list):
+        """Hand already-parsed rows straight to the writer (sharded workers)."""
+        self.rows.put((received, rows))
+
+    def _parse_loop(self):
+        while not (self._stop_parser.is_set() and self.frames.empty()):
+            try:
+                received, message = self.frames.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.frame_queue_lag.set(time.monotonic() - received)
+            self.frame_queue_depth.set(self.frames.qsize())
+            try:
+                rows = self.processor.parse(message)
+            except Exception as e:
+                logger.warning("Skip bad frame: %s", e)
+                continue
+            if rows:
+                # Blocking put: a slow writer backs up into the frame queue,
+                # where the backpressure policy applies.
+                self.rows.put((received, rows))
+
+    def _write_loop(self):
+        processor = self.processor
+        while not (self._stop_writer.is_set() and self.rows.empty()):
+            timeout = max(0.05, processor.next_flush_at() - time.time())
+            try:
+                received, rows = self.rows.get(timeout=timeout)
+                processor.add_rows(rows)
+                self.row_queue_lag.set(time.monotonic() - received)
+                self.row_queue_depth.set(self.rows.qsize())
+            except queue.Empty:
+                pass
+            try:
+                processor.maybe_flush()
+            except Exception as e:
+                logger.error("Writer error: %s", e)
+        processor.flush()
@@ -0,0 +1,107 @@
+"""
+Replay a capture into the processor or through a local websocket server.
+
+    # straight into Processor.handle_message against POSTGRES_* (max speed)
+    python replay.py captures/ticker.jsonl.gz --speed max
+    # serve it at 10x on ws://localhost:9443/ws/!ticker@arr for `python app.py`
+    python replay.py captures/ticker.jsonl.gz --target ws --speed 10 --loop
+"""
+
+import argparse
+import socketserver
+import time
+
+from capture import read_capture
+from fake_binance import Handler, ws_frame
+
+
+def parse_speed(value: str) -> float:
+    """'max' (or 0) = no pacing, otherwise a multiple of real time."""
+    return 0.0 if value in ("max", "0") else float(value.rstrip("x"))
+
+
+def paced(frames, speed: float):
+    """Yield frames, sleeping so they keep their recorded spacing / `speed`."""
+    start_wall = start_rec = None
+    for received, frame in frames:
+        if speed > 0:
+            if start_wall is None:
+                start_wall, start_rec = time.monotonic(), received
+            delay = (received - start_rec) / speed - (time.monotonic() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        yield frame
+
+
+def replay_to_processor(processor, path: str, speed: float = 0.0) -> int:
+    frames = 0
+    for frame in paced(read_capture(path), speed):
+        processor.handle_message(frame)
+        frames += 1
+    processor.flush()
+    return frames
+
+
+class ReplayHandler(Handler):
+    def serve_websocket(self, url, key):
+        self.accept_websocket(key)
+        server = self.server
+        while not self.closed.is_set():
+            for frame in paced(read_capture(server.path), server.speed):
+                if self.closed.is_set():
+                    return
+                try:
+                    self.send(ws_frame(frame.encode()))
+                except OSError:
+                    return
+            if not server.loop:
+                break
+        # Close handshake, so the client reconnects and the reader thread exits
+        try:
+            self.send(ws_frame(b"\x03\xe8", opcode=0x8))
+        except OSError:
+            pass
+        self.closed.set()
+
+
+class ReplayServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, path: str, speed: float = 1.0, loop: bool = False):
+        super().__init__(address, ReplayHandler)
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("capture")
+    parser.add_argument("--target", choices=("processor", "ws"), default="processor")
+    parser.add_argument("--speed", default="1", help="1, 10, 10x, ... or max")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--loop", action="store_true",
+                        help="ws target: restart the capture when it ends")
+    args = parser.parse_args()
+    speed = parse_speed(args.speed)
+
+    if args.target == "ws":
+        server = ReplayServer((args.host, args.port), args.capture, speed, args.loop)
+        print(f"Replaying {args.capture} on ws://{args.host}:{args.port}/ws/!ticker@arr")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    from app import Processor
+    started = time.perf_counter()
+    frames = replay_to_processor(Processor(), args.capture, speed)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {frames} frames in {elapsed:.1f}s ({frames / elapsed:,.0f} frames/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from change_filter import event_seconds
+
+# Both statements recompute whole buckets from their source, so re-running
+# them (spool replay, duplicate rows dropped by ON CONFLICT, late ticks) is
+# always safe.
+BAR_COLUMNS = ("symbol, bucket, open, high, low, close, price_sum, tick_count, "
+               "volume, price_change, price_change_percent, updated_at")
+
+BAR_UPSERT = """
+    ON CONFLICT (symbol, bucket) DO UPDATE SET
+        open = EXCLUDED.open, high = EXCLUDED.high, low = EXCLUDED.low,
+        close = EXCLUDED.close, price_sum = EXCLUDED.price_sum,
+        tick_count = EXCLUDED.tick_count, volume = EXCLUDED.volume,
+        price_change = EXCLUDED.price_change,
+        price_change_percent = EXCLUDED.price_change_percent,
+        updated_at = EXCLUDED.updated_at
+"""
+
+ROLLUP_1M = f"""
+    INSERT INTO public.coin_bars_1m ({BAR_COLUMNS})
+    SELECT symbol, date_trunc('minute', event_time),
+           (array_agg(price ORDER BY event_time))[1], max(price), min(price),
+           (array_agg(price ORDER BY event_time DESC))[1], sum(price), count(*),
+           (array_agg(volume ORDER BY event_time DESC))[1],
+           (array_agg(price_change ORDER BY event_time DESC))[1],
+           (array_agg(price_change_percent ORDER BY event_time DESC))[1],
+           NOW()
+    FROM public.coin_ticks
+    WHERE symbol = ANY(%(symbols)s)
+      AND event_time >= %(start)s AND event_time < %(end)s
+    GROUP BY 1, 2
+    {BAR_UPSERT}
+"""
+
+ROLLUP_1H = f"""
+    INSERT INTO public.coin_bars_1h ({BAR_COLUMNS})
+    SELECT symbol, date_trunc('hour', bucket),
+           (array_agg(open ORDER BY bucket))[1], max(high), min(low),
+           (array_agg(close ORDER BY bucket DESC))[1], sum(price_sum),
+           sum(tick_count), (array_agg(volume ORDER BY bucket DESC))[1],
+           (array_agg(price_change ORDER BY bucket DESC))[1],
+           (array_agg(price_change_percent ORDER BY bucket DESC))[1],
+           NOW()
+    FROM public.coin_bars_1m
+    WHERE symbol = ANY(%(symbols)s)
+      AND bucket >= %(hour_start)s AND bucket < %(hour_end)s
+    GROUP BY 1, 2
+    {BAR_UPSERT}
+"""
+
+
+# 1-minute actuals for coin_data_with_forecasts (init-scripts/005)
+CHART_ACTUALS = """
+    INSERT INTO public.coin_chart_data (symbol, time, data_type, actual_price, "timestamp")
+    SELECT symbol, bucket, 'actual', close, updated_at
+    FROM public.coin_bars_1m
+    WHERE symbol = ANY(%(symbols)s)
+      AND bucket >= %(start)s AND bucket < %(end)s
+    ON CONFLICT (symbol, time, data_type) DO UPDATE SET
+        actual_price = EXCLUDED.actual_price, "timestamp" = EXCLUDED."timestamp"
+"""
+
+
+def touched_range(rows):
+    """Symbols and [first minute, last minute + 1m) covered by `rows`."""
+    symbols = sorted({row[0] for row in rows})
+    seconds = [event_seconds(row[1]) for row in rows]
+    first = datetime.utcfromtimestamp(min(seconds)).replace(second=0, microsecond=0)
+    last = datetime.utcfromtimestamp(max(seconds)).replace(second=0, microsecond=0)
+    return symbols, first, last + timedelta(minutes=1)
+
+
+def refresh_rollups(conn, rows):
+    """Re-aggregate the 1m/1h bars and chart minutes `rows` (committed) touch."""
+    if not rows:
+        return
+    symbols, start, end = touched_range(rows)
+    params = dict(
+        symbols=symbols, start=start, end=end,
+        hour_start=start.replace(minute=0),
+        hour_end=(end - timedelta(minutes=1)).replace(minute=0) + timedelta(hours=1),
+    )
+    with conn.cursor() as cur:
+        cur.execute(ROLLUP_1M, params)
+        cur.execute(ROLLUP_1H, params)
+        cur.execute(CHART_ACTUALS, params)
+    conn.commit()
@@ -0,0 +1,154 @@
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import websocket
+
+logger = logging.getLogger(__name__)
+
+
+def split_shards(symbols: list, shards: int) -> list:
+    """Round-robin `symbols` over at most `shards` non-empty shards."""
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards)]
+
+
+def combined_stream_url(ws_base: str, symbols: list) -> str:
+    streams = "/".join(f"{sym.lower()}@ticker" for sym in symbols)
+    return f"{ws_base}/stream?streams={streams}"
+
+
+def fetch_snapshot(rest_base: str, symbols: list, timeout: float = 10.0) -> str:
+    """Current 24h tickers from the REST API, re-encoded as a `!ticker@arr` frame."""
+    query = urllib.parse.quote(json.dumps(symbols, separators=(",", ":")))
+    url = f"{rest_base}/api/v3/ticker/24hr?symbols={query}"
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        tickers = json.load(resp)
+    return json.dumps([{
+        "e": "24hrTicker", "E": t["closeTime"], "s": t["symbol"],
+        "p": t["priceChange"], "P": t["priceChangePercent"],
+        "c": t["lastPrice"], "h": t["highPrice"], "l": t["lowPrice"],
+        "v": t["volume"],
+    } for t in tickers], separators=(",", ":"))
+
+
+def run_shard(shard_id: int, symbols: list, parse, out, ws_base: str,
+              rest_base: str, backfill: bool = True):
+    """Worker process: receive and parse one shard, hand rows to the writer.
+
+    Each (re)connect first backfills the shard from the REST snapshot so the
+    latest state is written even if frames were missed while disconnected.
+    """
+    name = f"shard-{shard_id}"
+    url = combined_stream_url(ws_base, symbols)
+    dropped = 0
+    frames = 0  # received since the last batch handed over
+
+    def emit(message):
+        nonlocal dropped, frames
+        started = time.perf_counter()
+        rows = parse(message)
+        if not rows:
+            return
+        try:
+            # Parse time and frame count travel with the rows; metrics live
+            # in the parent
+            out.put_nowait((time.monotonic(), rows, time.perf_counter() - started,
+                            frames))
+            frames = 0
+        except queue.Full:
+            # Writer is behind; newer snapshots will supersede these
+            dropped += 1
+            if dropped % 1000 == 1:
+                logger.warning("%s: writer queue full, dropped %d batches",
+                               name, dropped)
+
+    def on_open(ws):
+        logger.info("%s: connected (%d symbols)", name, len(symbols))
+        if backfill:
+            try:
+                emit(fetch_snapshot(rest_base, symbols))
+            except Exception as e:
+                logger.warning("%s: backfill failed: %s", name, e)
+
+    def on_message(ws, message):
+        nonlocal frames
+        frames += 1
+        try:
+            emit(message)
+        except Exception as e:
+            logger.warning("%s: skip bad frame: %s", name, e)
+
+    def on_error(ws, error):
+        logger.error("%s: websocket error: %s", name, error)
+
+    backoff = 1.0
+    while True:
+        started = time.time()
+        ws = websocket.WebSocketApp(url, on_open=on_open,
+                                    on_message=on_message, on_error=on_error)
+        ws.run_forever(ping_interval=15, ping_timeout=10)
+        # Reset the backoff after a connection that stayed up for a while
+        backoff = 1.0 if time.time() - started > 60 else min(backoff * 2, 30.0)
+        logger.info("%s: disconnected, reconnecting in %.0fs", name, backoff)
+        time.sleep(backoff)
+
+
+class ShardSupervisor:
+    """Runs one worker process per shard and forwards their rows to a pipeline.
+
+    Workers receive and parse in parallel; the parent keeps the single
+    Postgres writer. Dead workers are restarted.
+    """
+
+    def __init__(self, pipeline, symbols: list, shards: int, parse,
+                 ws_base: str, rest_base: str, queue_size: int = 1000,
+                 backfill: bool = True):
+        self.pipeline = pipeline
+        self.shards = split_shards(symbols, shards)
+        self.parse = parse
+        self.ws_base = ws_base
+        self.rest_base = rest_base
+        self.backfill = backfill
+        # Spawned, not forked, so workers never inherit the writer's
+        # Postgres socket
+        self.ctx = multiprocessing.get_context("spawn")
+        self.out = self.ctx.Queue(maxsize=queue_size)
+        self.procs = {}
+
+    def _spawn(self, shard_id: int):
+        proc = self.ctx.Process(
+            target=run_shard, name=f"shard-{shard_id}", daemon=True,
+            args=(shard_id, self.shards[shard_id], self.parse, self.out,
+                  self.ws_base, self.rest_base, self.backfill))
+        proc.start()
+        self.procs[shard_id] = proc
+
+    def _forward(self):
+        processor = self.pipeline.processor
+        while True:
+            received, rows, parse_secs, frames = self.out.get()
+            self.pipeline.frames_received.inc(frames)
+            processor.parse_seconds.observe(parse_secs)
+            processor.ticks_parsed.inc(len(rows))
+            self.pipeline.submit_rows(received, rows)
+
+    def run(self):
+        logger.info("Starting %d shards for %d symbols", len(self.shards),
+                    sum(len(s) for s in self.shards))
+        threading.Thread(target=self._forward, name="shard-forwarder",
+                         daemon=True).start()
+        for shard_id in range(len(self.shards)):
+            self._spawn(shard_id)
+        while True:
+            time.sleep(5)
+            for shard_id, proc in list(self.procs.items()):
+                if not proc.is_alive():
+                    logger.error("Shard %d exited (code %s), restarting",
+                                 shard_id, proc.exitcode)
+                    self._spawn(shard_id)
@@ -0,0 +1,156 @@
+import logging
+import os
+import pickle
+import struct
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Record = length + crc32 of the pickled batch, then the payload
+RECORD_HEADER = struct.Struct("!II")
+CHECKPOINT_FILE = "checkpoint"
+
+
+class Spool:
+    """Append-only on-disk queue of row batches that could not be written.
+
+    Batches go to numbered segment files (`seg-000000000001.log`, ...). A
+    checkpoint file records the (segment, offset) of the first batch not yet
+    committed to Postgres, so a restart resumes replay from there. Segments
+    are deleted once fully replayed. A torn record at the tail (crash while
+    appending) fails its checksum and is skipped.
+    """
+
+    def __init__(self, path: str, segment_bytes: int = 64 * 1024 * 1024,
+                 max_bytes: int = 0):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self.read_seq, self.read_offset = self._load_checkpoint()
+        # Always append to a fresh segment so a torn tail left by a crash
+        # stays at the end of its segment
+        segments = self.segments()
+        self.write_seq = segments[-1] + 1 if segments else max(self.read_seq, 1)
+        self._writer = None
+
+    # -- segment bookkeeping -------------------------------------------------
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.path, f"seg-{seq:012d}.log")
+
+    def segments(self) -> list:
+        return sorted(
+            int(name[4:-4]) for name in os.listdir(self.path)
+            if name.startswith("seg-") and name.endswith(".log")
+        )
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(self._segment_path(seq))
+                   for seq in self.segments())
+
+    def pending(self) -> bool:
+        for seq in self.segments():
+            if seq > self.read_seq:
+                return True
+            if seq == self.read_seq and \
+                    os.path.getsize(self._segment_path(seq)) > self.read_offset:
+                return True
+        return False
+
+    def _load_checkpoint(self):
+        try:
+            with open(os.path.join(self.path, CHECKPOINT_FILE)) as f:
+                seq, offset = f.read().split()
+                return int(seq), int(offset)
+        except FileNotFoundError:
+            segments = self.segments()
+            return (segments[0] if segments else 1), 0
+
+    def _save_checkpoint(self):
+        tmp = os.path.join(self.path, CHECKPOINT_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(f"{self.read_seq} {self.read_offset}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, CHECKPOINT_FILE))
+
+    # -- writing -------------------------------------------------------------
+
+    def append(self, rows):
+        if not rows:
+            return
+        payload = pickle.dumps(list(rows), protocol=pickle.HIGHEST_PROTOCOL)
+        if self._writer is None:
+            self._writer = open(self._segment_path(self.write_seq), "ab")
+        elif self._writer.tell() >= self.segment_bytes:
+            self._writer.close()
+            self.write_seq += 1
+            self._writer = open(self._segment_path(self.write_seq), "ab")
+        self._writer.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._writer.write(payload)
+        self._writer.flush()
+        os.fsync(self._writer.fileno())
+        if self.max_bytes:
+            self._enforce_limit()
+
+    def _enforce_limit(self):
+        segments = self.segments()
+        while len(segments) > 1 and self.size_bytes() > self.max_bytes:
+            oldest = segments.pop(0)
+            logger.error("Spool over %d bytes, dropping segment %d",
+                         self.max_bytes, oldest)
+            os.remove(self._segment_path(oldest))
+            if oldest >= self.read_seq:
+                self.read_seq, self.read_offset = segments[0], 0
+                self._save_checkpoint()
+
+    # -- replay --------------------------------------------------------------
+
+    def _read_records(self, max_rows: int):
+        """Collect batches from the checkpoint until `max_rows` rows.
+
+        Returns the rows and the (segment, offset) just after the last batch.
+        """
+        rows = []
+        seq, offset = self.read_seq, self.read_offset
+        for seg in self.segments():
+            if seg < seq:
+                continue
+            if seg > seq:
+                seq, offset = seg, 0
+            with open(self._segment_path(seg), "rb") as f:
+                f.seek(offset)
+                while len(rows) < max_rows:
+                    header = f.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    length, crc = RECORD_HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != crc:
+                        logger.warning("Skip torn spool record in segment %d", seg)
+                        f.seek(0, os.SEEK_END)
+                        offset = f.tell()
+                        break
+                    rows.extend(pickle.loads(payload))
+                    offset = f.tell()
+            if len(rows) >= max_rows:
+                break
+        return rows, seq, offset
+
+    def replay(self, write, max_rows: int = 20000) -> int:
+        """Write up to `max_rows` spooled rows with `write(rows)` and checkpoint.
+
+        `write` must commit before returning; if it raises, nothing is
+        checkpointed and the same rows are replayed next time.
+        """
+        rows, seq, offset = self._read_records(max_rows)
+        if rows:
+            write(rows)
+        self.read_seq, self.read_offset = seq, offset
+        self._save_checkpoint()
+        # Drop fully replayed segments, but never the one being appended to
+        for old in self.segments():
+            if old < seq and old != self.write_seq:
+                os.remove(self._segment_path(old))
+        return len(rows)
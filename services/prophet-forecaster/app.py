@@ -1,12 +1,26 @@
+import math
 import os
+import signal
+import threading
+import time
 import logging
+import multiprocessing
 import pandas as pd
 import psycopg2
+import psycopg2.errors
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from prophet import Prophet
 from flask import Flask, jsonify, request
 from tenacity import retry, stop_after_attempt, wait_exponential
 import numpy as np
+from model_cache import ModelCache
+from jobs import JobManager
+from engines import ENGINES
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -23,111 +37,212 @@ PG_CONN_INFO = dict(
     password=os.getenv("POSTGRES_PASSWORD")
 )
 
+# Connection pool size per process (the Flask process and each batch worker)
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "8"))
+
+# Rows per round trip when streaming training data from a server-side cursor
+FETCH_CHUNK_ROWS = int(os.getenv("FETCH_CHUNK_ROWS", "10000"))
+
+# /forecast/batch: worker processes and the time limit for each symbol
+# (fit + predict; 0 = none)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+SYMBOL_TIMEOUT_SECS = float(os.getenv("SYMBOL_TIMEOUT_SECS", "120"))
+
+# Background jobs (/jobs): jobs of each queue running at once, and seconds a
+# finished job's result is kept for polling
+JOB_CONCURRENCY = dict(
+    batch=int(os.getenv("JOB_BATCH_CONCURRENCY", "1")),
+    symbol=int(os.getenv("JOB_SYMBOL_CONCURRENCY", "2"))
+)
+JOB_RETENTION_SECS = float(os.getenv("JOB_RETENTION_SECS", "3600"))
+
+# Fitted models per (symbol, granularity, lookback): LRU size (0 = off),
+# seconds before a cold refit, and a directory to persist them ("" = memory)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "64"))
+MODEL_CACHE_TTL_SECS = float(os.getenv("MODEL_CACHE_TTL_SECS", "3600"))
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "")
+
+# /forecast/<symbol> answers from a stored run made within this many seconds
+# (same granularity, lookback and horizon) instead of refitting; 0 = always refit
+FORECAST_MAX_AGE_SECS = float(os.getenv("FORECAST_MAX_AGE_SECS", "3600"))
+
+# Forecasting engine used unless a request passes model=: prophet, or one
+# of the lightweight engines in engines.py (ewma, holt_winters, ar)
+FORECAST_MODEL = os.getenv("FORECAST_MODEL", "prophet")
+
+# Prophet settings, recorded with every run in forecast_runs.params
+PROPHET_PARAMS = dict(
+    daily_seasonality=True,
+    weekly_seasonality=True,
+    yearly_seasonality=False,  # Crypto doesn't follow yearly patterns
+    changepoint_prior_scale=0.05,  # Lower value = less flexible
+    seasonality_prior_scale=10.0,
+    interval_width=0.8
+)
+HOURLY_SEASONALITY = dict(name='hourly', period=1, fourier_order=8)
+
+# Spacing of forecast points per granularity (forecast_runs.step)
+GRANULARITY_STEPS = {'hour': '1 hour', 'minute': '1 minute'}
+
+_pg_pool = None
+_pg_pool_pid = None
+_pg_pool_lock = threading.Lock()
+
 @retry(stop=stop_after_attempt(5), wait=wait_exponential(min=1, max=30))
-def get_db_connection():
-    """Get database connection with retry logic"""
-    return psycopg2.connect(**PG_CONN_INFO)
+def open_db_pool():
+    """Open the connection pool with retry logic"""
+    return ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, **PG_CONN_INFO)
 
-def fetch_historical_data(symbol: str, days: int = 30, granularity: str = "hour", hours: int | None = None):
-    """Fetch historical price data for the given symbol with flexible granularity.
+def get_db_pool():
+    """This process's connection pool, opened on first use"""
+    global _pg_pool, _pg_pool_pid
+    pool, pid = _pg_pool, os.getpid()
+    if pool is not None and _pg_pool_pid == pid:
+        return pool
+    with _pg_pool_lock:
+        # Checked again: another thread may have opened it while we waited.
+        # A pool inherited through fork shares the parent's sockets, so a
+        # forked process leaves it alone and opens its own
+        if _pg_pool is None or _pg_pool_pid != pid:
+            _pg_pool, _pg_pool_pid = open_db_pool(), pid
+        return _pg_pool
+
+@contextmanager
+def get_db_connection():
+    """Borrow a connection from this process's pool.
 
-    - granularity="hour": aggregates by hour over last `days` days
-    - granularity="minute": fetches raw ticks for last `hours` (default 6) and resamples to 1-minute averages
+    Callers commit what they want kept; anything left open is rolled back
+    when the connection goes back, and broken connections are discarded.
     """
+    pool = get_db_pool()
+    conn = pool.getconn()
     try:
-        conn = get_db_connection()
-
-        if granularity == "minute":
-            # Default lookback hours for minute data
-            lookback_hours = hours or 6
-            logger.info(f"Querying minute data: symbol={symbol}, hours={lookback_hours}")
-            query = """
-                SELECT 
-                    event_time AS ts,
-                    price::numeric AS price
-                FROM public.coin_ticks
-                WHERE symbol = %s 
-                  AND event_time >= NOW() - INTERVAL '%s hours'
-                ORDER BY ts
-            """
-            df_raw = pd.read_sql_query(query, conn, params=(symbol, lookback_hours))
-            logger.info(f"Raw data fetched: {len(df_raw)} rows")
-            conn.close()
-
-            if df_raw.empty:
-                logger.warning(f"No raw data found for symbol {symbol}")
-                return None
-
-            # Resample to 1-minute frequency using pandas
-            df_raw['ts'] = pd.to_datetime(df_raw['ts'])
-            df_raw.set_index('ts', inplace=True)
-            
-            # Use mean over each minute; forward fill missing minutes to maintain continuity
-            df_min = df_raw['price'].resample('1T').mean()
-            
-            # Drop NaN values and forward fill only if we have enough data
-            df_min = df_min.dropna()
-            if len(df_min) < 10:
-                # If resampling results in too few points, use original data with time rounding
-                logger.info(f"Resampling yielded too few points ({len(df_min)}), using rounded timestamps instead")
-                df_raw_copy = df_raw.copy()
-                df_raw_copy.index = df_raw_copy.index.round('T')  # Round to nearest minute
-                df_min = df_raw_copy['price'].groupby(df_raw_copy.index).mean()
-            
-            df_min = df_min.reset_index().rename(columns={'ts': 'ds', 'price': 'y'})
-            logger.info(f"After resampling: {len(df_min)} minute intervals")
+        yield conn
+    finally:
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        pool.putconn(conn, close=broken)
 
-            # Ensure numeric types
-            df_min['ds'] = pd.to_datetime(df_min['ds'])
-            df_min['y'] = pd.to_numeric(df_min['y'])
-            return df_min[['ds', 'y']]
+# Training bars per granularity: bar table, bucket width for aggregating raw
+# ticks when the bar tables are missing, and the unit of the lookback
+BAR_SOURCES = {
+    'minute': ('coin_bars_1m', 'minute', 'hours'),
+    'hour': ('coin_bars_1h', 'hour', 'days'),
+}
 
-        else:
-            # Hourly aggregation for last `days` days
-            query = """
-                SELECT 
-                    date_trunc('hour', event_time) as ds,
-                    AVG(price) as y,
-                    symbol
-                FROM public.coin_ticks 
-                WHERE symbol = %s 
-                  AND event_time >= NOW() - INTERVAL '%s days'
-                GROUP BY date_trunc('hour', event_time), symbol
-                ORDER BY ds
-            """
-            df = pd.read_sql_query(query, conn, params=(symbol, days))
-            conn.close()
-
-            if df.empty:
-                logger.warning(f"No data found for symbol {symbol}")
-                return None
-
-            df['ds'] = pd.to_datetime(df['ds'])
-            df['y'] = pd.to_numeric(df['y'])
-            return df[['ds', 'y']]
+BARS_QUERY = """
+    SELECT symbol, bucket AS ds, mean::double precision AS y
+    FROM public.{table}
+    WHERE symbol = ANY(%s)
+      AND bucket >= NOW() - INTERVAL '%s {unit}'
+    ORDER BY symbol, bucket
+"""
+
+# Same series bucketed in SQL from coin_ticks (bars not set up)
+TICKS_QUERY = """
+    SELECT symbol, date_trunc('{width}', event_time) AS ds, avg(price)::double precision AS y
+    FROM public.coin_ticks
+    WHERE symbol = ANY(%s)
+      AND event_time >= NOW() - INTERVAL '%s {unit}'
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+"""
+
+def _stream_frames(conn, query, params):
+    """Run query on a server-side cursor, FETCH_CHUNK_ROWS rows at a time.
+
+    Only one chunk of raw tuples is held at once, so long minute windows
+    do not need the whole result set materialised before it is split.
+    """
+    pieces = {}
+    with conn.cursor(name='training_data') as cursor:
+        cursor.itersize = FETCH_CHUNK_ROWS
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_CHUNK_ROWS)
+            if not rows:
+                break
+            chunk = pd.DataFrame(rows, columns=['symbol', 'ds', 'y'])
+            for symbol, group in chunk.groupby('symbol', sort=False):
+                pieces.setdefault(symbol, []).append(group[['ds', 'y']])
+    frames = {}
+    for symbol, parts in pieces.items():
+        df = pd.concat(parts, ignore_index=True)
+        df['ds'] = pd.to_datetime(df['ds'])
+        df['y'] = pd.to_numeric(df['y'])
+        frames[symbol] = df
+    return frames
 
+def fetch_historical_data_many(symbols, days: int = 30, granularity: str = "hour", hours: int | None = None):
+    """Fetch training data for several symbols in one query.
+
+    Reads the incrementally maintained bars (init-scripts/003), so the cost
+    does not depend on how many raw ticks are stored; `y` is the bar mean.
+    Without the bar tables the same buckets are aggregated from coin_ticks
+    in SQL. Returns {symbol: DataFrame(ds, y)}; symbols without data are
+    left out.
+
+    - granularity="hour": coin_bars_1h over the last `days` days
+    - granularity="minute": coin_bars_1m over the last `hours` (default 6)
+    """
+    table, width, unit = BAR_SOURCES['minute' if granularity == 'minute' else 'hour']
+    # Default lookback hours for minute data
+    lookback = (hours or 6) if granularity == 'minute' else days
+    logger.info(f"Querying {granularity} data: {len(symbols)} symbols, {unit}={lookback}")
+    params = (list(symbols), lookback)
+
+    try:
+        with get_db_connection() as conn:
+            try:
+                frames = _stream_frames(conn, BARS_QUERY.format(table=table, unit=unit), params)
+            except psycopg2.errors.UndefinedTable:
+                conn.rollback()
+                logger.warning(f"{table} missing (apply init-scripts/003), aggregating coin_ticks instead")
+                frames = _stream_frames(conn, TICKS_QUERY.format(width=width, unit=unit), params)
     except Exception as e:
-        logger.error(f"Error fetching data for {symbol}: {str(e)}")
-        return None
+        logger.error(f"Error fetching data for {', '.join(symbols)}: {str(e)}")
+        return {}
+
+    for symbol in symbols:
+        if symbol in frames:
+            logger.info(f"Fetched {len(frames[symbol])} {granularity} bars for {symbol}")
+        else:
+            logger.warning(f"No data found for symbol {symbol}")
+    return frames
+
+def fetch_historical_data(symbol: str, days: int = 30, granularity: str = "hour", hours: int | None = None):
+    """Fetch historical price data for one symbol (see fetch_historical_data_many)"""
+    return fetch_historical_data_many([symbol], days, granularity, hours).get(symbol)
 
-def create_prophet_model(df):
-    """Create and train Prophet model"""
+def create_prophet_model(df, init=None):
+    """Create and train Prophet model, warm-started from `init` parameters if given"""
     try:
         # Initialize Prophet with some basic parameters
-        model = Prophet(
-            daily_seasonality=True,
-            weekly_seasonality=True,
-            yearly_seasonality=False,  # Crypto doesn't follow yearly patterns
-            changepoint_prior_scale=0.05,  # Lower value = less flexible
-            seasonality_prior_scale=10.0,
-            interval_width=0.8
-        )
+        model = Prophet(**PROPHET_PARAMS)
         
         # Add custom seasonalities for crypto
-        model.add_seasonality(name='hourly', period=1, fourier_order=8)
+        model.add_seasonality(**HOURLY_SEASONALITY)
         
         # Fit the model
-        model.fit(df)
+        fit_args = {} if init is None else {'init': init}
+        budget = _stan_budget()
+        if budget is not None:
+            # A batch symbol's remaining time, enforced by cmdstanpy, which
+            # kills CmdStan when it runs out. SIGALRM is paused meanwhile:
+            # interrupting the fit would abandon the CmdStan process
+            fit_args['timeout'] = budget
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        try:
+            model.fit(df, **fit_args)
+        except TimeoutError:
+            raise SymbolTimeout()
+        if budget is not None:
+            _arm_symbol_alarm()
         
         return model
         
@@ -135,6 +250,45 @@ def create_prophet_model(df):
         logger.error(f"Error creating Prophet model: {str(e)}")
         return None
 
+MODELS = ('prophet',) + tuple(ENGINES)
+
+def create_model(df, model='prophet', init=None):
+    """Fit `model` on df: Prophet (warm-started from `init`) or a lightweight engine.
+
+    Every model answers make_future_dataframe() / predict() like Prophet.
+    """
+    if model == 'prophet':
+        return create_prophet_model(df, init)
+    try:
+        return ENGINES[model](interval_width=PROPHET_PARAMS['interval_width']).fit(df)
+    except Exception as e:
+        logger.error(f"Error creating {model} model: {str(e)}")
+        return None
+
+MODEL_CACHE = (ModelCache(create_prophet_model, MODEL_CACHE_SIZE, MODEL_CACHE_TTL_SECS, MODEL_CACHE_DIR)
+               if MODEL_CACHE_SIZE > 0 else None)
+
+JOBS = JobManager(JOB_CONCURRENCY, JOB_RETENTION_SECS)
+
+def fit_model(symbol, granularity, lookback, df, model='prophet'):
+    """Fitted model for df through MODEL_CACHE; returns (model, outcome, fit seconds)
+
+    Only Prophet fits are cached; the lightweight engines refit in milliseconds.
+    """
+    if MODEL_CACHE is None or model != 'prophet':
+        started = time.perf_counter()
+        fitted = create_model(df, model)
+        return fitted, 'cold', time.perf_counter() - started
+    return MODEL_CACHE.fit((symbol, granularity, lookback), df)
+
+def fit_run(symbol, run, lookback, df):
+    """Fit the run's model on df, recording fit outcome, time and parameters in the run"""
+    model, run['params']['fit'], run['fit_seconds'] = fit_model(
+        symbol, run['granularity'], lookback, df, run['model'])
+    if model is not None and run['model'] != 'prophet':
+        run['params'].update(model.describe())
+    return model
+
 def generate_forecast(model, periods=24, freq: str = 'H'):
     """Generate forecast for the next periods using specified frequency.
 
@@ -157,198 +311,727 @@ def generate_forecast(model, periods=24, freq: str = 'H'):
         logger.error(f"Error generating forecast: {str(e)}")
         return None
 
-def save_forecast_to_db(symbol, forecast_df):
-    """Save forecast results to database"""
+def new_run(granularity, lookback, df, model='prophet'):
+    """Start the metadata for a forecast run trained on `df`"""
+    params = dict(PROPHET_PARAMS, hourly_seasonality=HOURLY_SEASONALITY) if model == 'prophet' else {}
+    return {
+        'granularity': granularity,
+        'model': model,
+        # lookback: training window in days (hour) or hours (minute)
+        'params': dict(params, lookback=lookback),
+        'train_start': df['ds'].iloc[0].to_pydatetime(),
+        'train_end': df['ds'].iloc[-1].to_pydatetime(),
+        'train_points': len(df),
+    }
+
+def save_forecast_to_db(symbol, forecast_df, run, chart=False):
+    """Save a forecast run; returns its run_id, or None on failure."""
+    return save_forecasts_to_db([(symbol, forecast_df, run)], chart).get(symbol)
+
+def save_forecasts_to_db(items, chart=False):
+    """Save (symbol, forecast_df, run) items in one transaction.
+
+    Each run's horizon goes to forecast_runs as arrays and becomes its
+    symbol's latest run; coin_forecasts (and coin_chart_data, with `chart`)
+    are filled from the stored arrays server-side, so the points cross the
+    wire once. The statement count does not depend on the number of symbols
+    or points. Returns {symbol: run_id}, empty if nothing could be saved.
+    """
+    if not items:
+        return {}
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Insert forecast data
-        for _, row in forecast_df.iterrows():
+        with get_db_connection() as conn:
+            return _save_forecasts(conn, items, chart)
+    except Exception as e:
+        logger.error(f"Error saving forecasts to database: {str(e)}")
+        return {}
+
+def _save_forecasts(conn, items, chart):
+    cursor = conn.cursor()
+    # One timestamp for the whole save
+    created_at = datetime.utcnow()
+
+    rows = [(
+        symbol,
+        run['granularity'],
+        run['model'],
+        Json(run['params']),
+        run['train_start'],
+        run['train_end'],
+        run['train_points'],
+        run.get('fetch_seconds'),
+        run.get('fit_seconds'),
+        run.get('predict_seconds'),
+        forecast_df['ds'].iloc[0].to_pydatetime(),
+        GRANULARITY_STEPS[run['granularity']],
+        forecast_df['yhat'].astype(float).tolist(),
+        forecast_df['yhat_lower'].astype(float).tolist(),
+        forecast_df['yhat_upper'].astype(float).tolist(),
+        created_at
+    ) for symbol, forecast_df, run in items]
+    run_ids = dict(execute_values(cursor, """
+        INSERT INTO public.forecast_runs
+        (symbol, granularity, model, params, train_start, train_end, train_points,
+         fetch_seconds, fit_seconds, predict_seconds, horizon_start, step,
+         predicted_price, lower_bound, upper_bound, created_at)
+        VALUES %s
+        RETURNING symbol, run_id
+    """, rows, template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::interval, %s, %s, %s, %s)",
+        page_size=len(rows), fetch=True))
+    ids = list(run_ids.values())
+
+    cursor.execute("""
+        INSERT INTO public.coin_forecasts
+        (symbol, forecast_time, predicted_price, lower_bound, upper_bound, created_at, run_id)
+        SELECT symbol, forecast_time, predicted_price, lower_bound, upper_bound, created_at, run_id
+        FROM public.forecast_run_points
+        WHERE run_id = ANY(%s)
+        ON CONFLICT (symbol, forecast_time)
+        DO UPDATE SET
+            predicted_price = EXCLUDED.predicted_price,
+            lower_bound = EXCLUDED.lower_bound,
+            upper_bound = EXCLUDED.upper_bound,
+            created_at = EXCLUDED.created_at,
+            run_id = EXCLUDED.run_id
+    """, (ids,))
+    cursor.execute("""
+        INSERT INTO public.forecast_latest (symbol, run_id, updated_at)
+        SELECT symbol, run_id, created_at
+        FROM public.forecast_runs
+        WHERE run_id = ANY(%s)
+        ON CONFLICT (symbol)
+        DO UPDATE SET run_id = EXCLUDED.run_id, updated_at = EXCLUDED.updated_at
+    """, (ids,))
+    if chart:
+        refresh_chart_forecasts(cursor, ids)
+
+    conn.commit()
+    cursor.close()
+
+    points = sum(len(forecast_df) for _, forecast_df, _ in items)
+    logger.info(f"Saved {points} forecast points for {len(run_ids)} symbols")
+    return run_ids
+
+def refresh_chart_forecasts(cursor, run_ids):
+    """Make these runs their symbols' only forecasts in coin_chart_data (same transaction).
+
+    Only the batch run refreshes the chart: coin_chart_data holds one
+    forecast line per symbol, so an ad-hoc run (e.g. granularity=minute or
+    another model) would otherwise replace the dashboard's hourly line.
+    """
+    cursor.execute("""
+        DELETE FROM public.coin_chart_data c
+        USING public.forecast_runs r
+        WHERE r.run_id = ANY(%s) AND c.symbol = r.symbol AND c.data_type = 'forecast'
+    """, (run_ids,))
+    cursor.execute("""
+        INSERT INTO public.coin_chart_data
+        (symbol, time, data_type, predicted_price, lower_bound, upper_bound, "timestamp")
+        SELECT symbol, forecast_time, 'forecast', predicted_price, lower_bound, upper_bound, created_at
+        FROM public.coin_forecasts
+        WHERE run_id = ANY(%s)
+    """, (run_ids,))
+
+def load_stored_forecast(symbol, model, granularity, lookback, periods, max_age):
+    """Newest matching run made within `max_age` seconds, as a /forecast/<symbol> body (or None)"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO public.coin_forecasts 
-                (symbol, forecast_time, predicted_price, lower_bound, upper_bound, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (symbol, forecast_time) 
-                DO UPDATE SET 
-                    predicted_price = EXCLUDED.predicted_price,
-                    lower_bound = EXCLUDED.lower_bound,
-                    upper_bound = EXCLUDED.upper_bound,
-                    created_at = EXCLUDED.created_at
-            """, (
-                symbol,
-                row['ds'],
-                float(row['yhat']),
-                float(row['yhat_lower']),
-                float(row['yhat_upper']),
-                datetime.utcnow()
-            ))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        logger.info(f"Saved {len(forecast_df)} forecast points for {symbol}")
-        return True
-        
+                SELECT run_id, params->>'fit', horizon_start, step, created_at,
+                       predicted_price[1:%(periods)s]::float8[],
+                       lower_bound[1:%(periods)s]::float8[],
+                       upper_bound[1:%(periods)s]::float8[],
+                       (NOW() AT TIME ZONE 'UTC') - created_at
+                FROM public.forecast_runs
+                WHERE symbol = %(symbol)s
+                  AND created_at >= (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %(max_age)s)
+                  AND model = %(model)s
+                  AND granularity = %(granularity)s
+                  AND params->'lookback' = to_jsonb(%(lookback)s)
+                  AND cardinality(predicted_price) >= %(periods)s
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, dict(symbol=symbol, model=model, granularity=granularity, lookback=lookback,
+                      periods=periods, max_age=max_age))
+            row = cursor.fetchone()
+            cursor.close()
     except Exception as e:
-        logger.error(f"Error saving forecast to database: {str(e)}")
-        return False
+        logger.error(f"Error loading stored forecast for {symbol}: {str(e)}")
+        return None
+    if row is None:
+        return None
+
+    run_id, fit, horizon_start, step, created_at, predicted, lower, upper, age = row
+    logger.info(f"Serving stored run {run_id} for {symbol} ({age.total_seconds():.0f}s old)")
+    forecast_list = pd.DataFrame({
+        'time': pd.date_range(horizon_start, periods=periods, freq=step).strftime('%Y-%m-%dT%H:%M:%S'),
+        'predicted_price': predicted,
+        'lower_bound': lower,
+        'upper_bound': upper
+    }).to_dict('records')
+    return {
+        'symbol': symbol,
+        'forecast_periods': periods,
+        'period_unit': granularity,
+        'run_id': run_id,
+        'model': model,
+        'fit': fit,
+        'cache': 'hit',
+        'age_seconds': round(age.total_seconds(), 1),
+        'created_at': created_at.isoformat(),
+        'forecast': forecast_list
+    }
 
 @app.route('/forecast/<symbol>')
 def forecast_symbol(symbol):
     """API endpoint to generate forecast for a specific symbol"""
     try:
-        # Get parameters from query string
-        days = request.args.get('days', 30, type=int)
-        periods = request.args.get('periods', 24, type=int)
-        granularity = request.args.get('granularity', 'hour', type=str)
-        hours = request.args.get('hours', None, type=int)
-        
-        logger.info(f"Forecast request: symbol={symbol}, granularity={granularity}, hours={hours}, days={days}, periods={periods}")
-        
-        # Validate symbol (should be in our list of tracked coins)
-        from configs import BINANCE20
-        if symbol not in BINANCE20:
-            return jsonify({'error': f'Symbol {symbol} not supported'}), 400
+        body, status = run_symbol_forecast(symbol, **symbol_forecast_args())
+        return jsonify(body), status
         
-        # Fetch historical data
-        if granularity == 'minute':
-            effective_hours = hours or 6
-            logger.info(f"Fetching minute-level data for {symbol} (last {effective_hours} hours)")
-            df = fetch_historical_data(symbol, days=days, granularity='minute', hours=effective_hours)
-            min_required = 10  # at least 10 data points for minute-level
+    except Exception as e:
+        logger.error(f"Error in forecast endpoint: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def symbol_forecast_args():
+    """Query parameters of /forecast/<symbol> (and /jobs/forecast/<symbol>)"""
+    return dict(
+        days=request.args.get('days', 30, type=int),
+        periods=request.args.get('periods', 24, type=int),
+        granularity=request.args.get('granularity', 'hour', type=str),
+        hours=request.args.get('hours', None, type=int),
+        model=request.args.get('model', FORECAST_MODEL, type=str),
+        max_age=request.args.get('max_age', FORECAST_MAX_AGE_SECS, type=float),
+        force=request.args.get('force', 'false').lower() in ('1', 'true', 'yes')
+    )
+
+def _no_progress(symbol, status, **details):
+    pass
+
+def run_symbol_forecast(symbol, days=30, periods=24, granularity='hour', hours=None,
+                        model=FORECAST_MODEL, max_age=FORECAST_MAX_AGE_SECS, force=False,
+                        progress=_no_progress):
+    """Fetch, fit, predict and save one symbol; returns (response body, HTTP status).
+
+    `model` is 'prophet' or one of engines.ENGINES. A stored run of the same
+    model, with the same granularity, lookback and at least `periods`
+    points, made within `max_age` seconds, is served instead unless `force`.
+    The body's `cache` says which happened: hit (stored run), miss (none
+    fresh enough), bypass (forced) or off (max_age 0); `age_seconds` is how
+    old the forecast is. `progress(symbol, status, **details)` is told each
+    stage and its timings.
+    """
+    logger.info(f"Forecast request: symbol={symbol}, granularity={granularity}, hours={hours}, days={days}, periods={periods}")
+    
+    # Validate symbol (should be in our list of tracked coins)
+    from configs import SYMBOLS
+    if symbol not in SYMBOLS:
+        progress(symbol, 'failed', error='not supported')
+        return {'error': f'Symbol {symbol} not supported'}, 400
+    if model not in MODELS:
+        progress(symbol, 'failed', error='unknown model')
+        return {'error': f'Unknown model {model}', 'models': list(MODELS)}, 400
+    # `model` becomes the fitted model below
+    model_name = model
+    
+    unit = 'minute' if granularity == 'minute' else 'hour'
+    lookback = (hours or 6) if unit == 'minute' else days
+    if force:
+        cache = 'bypass'
+    elif max_age > 0:
+        stored = load_stored_forecast(symbol, model_name, unit, lookback, periods, max_age)
+        if stored:
+            progress(symbol, 'succeeded', cache='hit', run_id=stored['run_id'],
+                     age_seconds=stored['age_seconds'])
+            return dict(stored, training_days=days), 200
+        cache = 'miss'
+    else:
+        cache = 'off'
+    
+    # Fetch historical data
+    progress(symbol, 'running', stage='fetch')
+    started = time.perf_counter()
+    if granularity == 'minute':
+        logger.info(f"Fetching minute-level data for {symbol} (last {lookback} hours)")
+        df = fetch_historical_data(symbol, days=days, granularity='minute', hours=lookback)
+        min_required = 10  # at least 10 data points for minute-level
+    else:
+        logger.info(f"Fetching hourly data for {symbol} (last {days} days)")
+        df = fetch_historical_data(symbol, days=days, granularity='hour')
+        min_required = 24  # at least 24 hours
+    fetch_seconds = time.perf_counter() - started
+
+    if df is None or len(df) < min_required:
+        # Try with lower requirements if we have some data
+        if df is not None and len(df) >= 10:
+            logger.info(f"Relaxing requirements for {symbol}: using {len(df)} points instead of {min_required}")
+            min_required = len(df)
         else:
-            logger.info(f"Fetching hourly data for {symbol} (last {days} days)")
-            df = fetch_historical_data(symbol, days=days, granularity='hour')
-            min_required = 24  # at least 24 hours
-
-        if df is None or len(df) < min_required:
-            # Try with lower requirements if we have some data
-            if df is not None and len(df) >= 10:
-                logger.info(f"Relaxing requirements for {symbol}: using {len(df)} points instead of {min_required}")
-                min_required = len(df)
-            else:
-                return jsonify({'error': f'Insufficient data for {symbol}', 'required_points': min_required, 'available_points': (0 if df is None else len(df))}), 400
-        
-        # Create and train model
-        logger.info(f"Training Prophet model for {symbol}")
-        model = create_prophet_model(df)
-        
-        if model is None:
-            return jsonify({'error': f'Failed to create model for {symbol}'}), 500
-        
-        # Generate forecast
-        if granularity == 'minute':
-            logger.info(f"Generating {periods} minute forecast for {symbol}")
-            forecast = generate_forecast(model, periods, freq='T')
+            progress(symbol, 'failed', error='insufficient data')
+            return {'error': f'Insufficient data for {symbol}', 'required_points': min_required, 'available_points': (0 if df is None else len(df))}, 400
+    
+    # Create and train model
+    logger.info(f"Training {model_name} model for {symbol}")
+    progress(symbol, 'running', stage='fit', fetch_seconds=round(fetch_seconds, 3))
+    run = new_run(unit, lookback, df, model_name)
+    run['fetch_seconds'] = fetch_seconds
+    model = fit_run(symbol, run, lookback, df)
+    fit = run['params']['fit']
+    
+    if model is None:
+        progress(symbol, 'failed', error='model fit failed')
+        return {'error': f'Failed to create model for {symbol}'}, 500
+    
+    # Generate forecast
+    progress(symbol, 'running', stage='predict', fit=fit, fit_seconds=round(run['fit_seconds'], 3))
+    started = time.perf_counter()
+    if granularity == 'minute':
+        logger.info(f"Generating {periods} minute forecast for {symbol}")
+        forecast = generate_forecast(model, periods, freq='T')
+    else:
+        logger.info(f"Generating {periods} hour forecast for {symbol}")
+        forecast = generate_forecast(model, periods, freq='H')
+    run['predict_seconds'] = time.perf_counter() - started
+    
+    if forecast is None:
+        progress(symbol, 'failed', error='prediction failed')
+        return {'error': f'Failed to generate forecast for {symbol}'}, 500
+    
+    # Save to database
+    progress(symbol, 'running', stage='save', predict_seconds=round(run['predict_seconds'], 3))
+    run_id = save_forecast_to_db(symbol, forecast, run)
+    progress(symbol, 'succeeded', stage=None, run_id=run_id)
+    
+    # Prepare response
+    forecast_list = pd.DataFrame({
+        'time': forecast['ds'].dt.strftime('%Y-%m-%dT%H:%M:%S'),
+        'predicted_price': forecast['yhat'].astype(float),
+        'lower_bound': forecast['yhat_lower'].astype(float),
+        'upper_bound': forecast['yhat_upper'].astype(float)
+    }).to_dict('records')
+    
+    return {
+        'symbol': symbol,
+        'forecast_periods': periods,
+        'period_unit': ('minute' if granularity == 'minute' else 'hour'),
+        'training_days': days,
+        'run_id': run_id,
+        'model': model_name,
+        'fit': fit,
+        'cache': cache,
+        'age_seconds': 0.0,
+        'forecast': forecast_list
+    }, 200
+
+def fetch_batch_training_data(symbols):
+    """Training data for a batch in at most two queries.
+
+    Hourly bars (last 30 days) for every symbol; symbols with fewer than 24
+    fall back to minute bars (last hour). Returns {symbol: (granularity,
+    lookback, df)} for symbols with at least 10 points, and the errors for
+    the rest.
+    """
+    hourly = fetch_historical_data_many(symbols, days=30, granularity='hour')
+    short = [symbol for symbol in symbols if len(hourly.get(symbol, ())) < 24]
+    if short:
+        logger.info(f"Hourly data insufficient for {', '.join(short)}, falling back to minute-level")
+    minute = fetch_historical_data_many(short, granularity='minute', hours=1) if short else {}
+
+    plans, errors = {}, []
+    for symbol in symbols:
+        if symbol in short:
+            # Relaxed requirement: 10 points instead of 24
+            granularity, lookback, df = 'minute', 1, minute.get(symbol)
         else:
-            logger.info(f"Generating {periods} hour forecast for {symbol}")
-            forecast = generate_forecast(model, periods, freq='H')
-        
+            granularity, lookback, df = 'hour', 30, hourly[symbol]
+        if df is None or len(df) < 10:
+            errors.append(f"Insufficient data for {symbol} (need at least 10 points, got {0 if df is None else len(df)})")
+        else:
+            plans[symbol] = (granularity, lookback, df)
+    return plans, errors
+
+def batch_forecast_symbol(symbol, granularity, lookback, df, fetch_seconds, model_name):
+    """Fit and predict one symbol for /forecast/batch.
+
+    Returns (result, None) on success or (None, error message).
+    """
+    try:
+        logger.info(f"Processing forecast for {symbol}")
+        # Next 24 hours, or next 60 minutes
+        freq, periods = ('T', 60) if granularity == 'minute' else ('H', 24)
+
+        run = new_run(granularity, lookback, df, model_name)
+        # The batch's shared fetch
+        run['fetch_seconds'] = fetch_seconds
+        model = fit_run(symbol, run, lookback, df)
+        fit = run['params']['fit']
+        if model is None:
+            return None, f"Failed to create model for {symbol}"
+
+        started = time.perf_counter()
+        forecast = generate_forecast(model, periods, freq=freq)
+        run['predict_seconds'] = time.perf_counter() - started
         if forecast is None:
-            return jsonify({'error': f'Failed to generate forecast for {symbol}'}), 500
-        
-        # Save to database
-        save_forecast_to_db(symbol, forecast)
-        
-        # Prepare response
-        forecast_list = []
-        for _, row in forecast.iterrows():
-            forecast_list.append({
-                'time': row['ds'].isoformat(),
-                'predicted_price': float(row['yhat']),
-                'lower_bound': float(row['yhat_lower']),
-                'upper_bound': float(row['yhat_upper'])
-            })
-        
-        return jsonify({
-            'symbol': symbol,
-            'forecast_periods': periods,
-            'period_unit': ('minute' if granularity == 'minute' else 'hour'),
-            'training_days': days,
-            'forecast': forecast_list
-        })
+            return None, f"Failed to generate forecast for {symbol}"
         
+        # Saved by the parent, together with the rest of the batch
+        return {
+            'forecast': forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']],
+            'run': run,
+            'fit': fit,
+            'fit_seconds': run['fit_seconds']
+        }, None
+            
     except Exception as e:
-        logger.error(f"Error in forecast endpoint: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return None, f"Error processing {symbol}: {str(e)}"
 
-@app.route('/forecast/batch')
-def forecast_batch():
-    """Generate forecasts for all supported symbols"""
+class SymbolTimeout(BaseException):
+    """Raised when a batch symbol runs out of time; not an Exception, so the
+    `except Exception` blocks in the fit/predict helpers let it through"""
+
+# time.monotonic() by which the batch worker's current symbol must be done
+_symbol_deadline = None
+
+def _on_symbol_timeout(signum, frame):
+    raise SymbolTimeout()
+
+def _arm_symbol_alarm():
+    """SIGALRM at _symbol_deadline (right away if it has passed)"""
+    signal.setitimer(signal.ITIMER_REAL, max(_symbol_deadline - time.monotonic(), 0.001))
+
+def _stan_budget():
+    """Seconds left for the batch symbol being fitted; None outside a batch worker"""
+    if _symbol_deadline is None:
+        return None
+    remaining = _symbol_deadline - time.monotonic()
+    if remaining <= 0:
+        raise SymbolTimeout()
+    return remaining
+
+def batch_worker(symbol, plan, fetch_seconds, timeout, model_name):
+    """Pool task: batch_forecast_symbol with a per-symbol time limit.
+
+    Tasks run on the worker process's main thread, so SIGALRM can interrupt
+    Python work that is taking too long. A Prophet fit gets the remaining
+    time as cmdstanpy's timeout instead (see create_prophet_model), so its
+    CmdStan process is killed rather than left running. Either way the
+    worker then moves on to the next symbol.
+    """
+    global _symbol_deadline
+    if timeout > 0:
+        signal.signal(signal.SIGALRM, _on_symbol_timeout)
+        _symbol_deadline = time.monotonic() + timeout
+        _arm_symbol_alarm()
     try:
-        from configs import BINANCE20
-        
-        results = {}
-        errors = []
-        
-        for symbol in BINANCE20:
+        try:
+            return batch_forecast_symbol(symbol, *plan, fetch_seconds, model_name)
+        finally:
+            # Disarmed inside the handled block: an alarm due meanwhile
+            # still lands in the except below
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except SymbolTimeout:
+        return None, f"Timed out forecasting {symbol} after {timeout:g}s"
+    finally:
+        _symbol_deadline = None
+
+_batch_pool = None
+_batch_pool_workers = 0
+_batch_pool_lock = threading.Lock()
+
+def get_batch_pool(workers):
+    """Process pool kept across batches, so the workers' model caches stay warm"""
+    global _batch_pool, _batch_pool_workers
+    with _batch_pool_lock:
+        if _batch_pool is not None and _batch_pool_workers != workers:
+            # Tasks already submitted (e.g. by a concurrent batch job) still finish
+            _batch_pool.shutdown(wait=False)
+            _batch_pool = None
+        if _batch_pool is None:
+            # Spawned, not forked: this process runs Flask and job threads,
+            # and a lock one of them holds at fork time would stay held in
+            # the worker forever
+            _batch_pool = ProcessPoolExecutor(max_workers=workers,
+                                              mp_context=multiprocessing.get_context("spawn"))
+            _batch_pool_workers = workers
+        return _batch_pool
+
+def discard_batch_pool(pool, cancel=False):
+    """Drop a pool that raised BrokenProcessPool or overran its batch; the
+    next batch starts a new one. `cancel` also drops its queued tasks."""
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is pool:
+            _batch_pool = None
+    pool.shutdown(wait=False, cancel_futures=cancel)
+
+def pooled_forecasts(plans, fetch_seconds, workers, timeout, model_name):
+    """Run batch_worker for every planned symbol on the process pool.
+
+    Yields (symbol, result, error) as the symbols finish. With a per-symbol
+    `timeout`, the batch as a whole gets timeout x ceil(symbols / workers);
+    symbols still unfinished then are reported as failed and the pool is
+    discarded with their tasks cancelled.
+    """
+    def submit(pool):
+        return {pool.submit(batch_worker, symbol, plan, fetch_seconds, timeout, model_name): symbol
+                for symbol, plan in plans.items()}
+
+    pool = get_batch_pool(workers)
+    try:
+        futures = submit(pool)
+    except BrokenProcessPool:
+        # Broken during an earlier batch
+        discard_batch_pool(pool)
+        pool = get_batch_pool(workers)
+        futures = submit(pool)
+    deadline = timeout * math.ceil(len(futures) / workers) if timeout > 0 else None
+    pending = dict(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            symbol = pending.pop(future)
             try:
-                logger.info(f"Processing forecast for {symbol}")
-                
-                # Try hourly data first (last 30 days)
-                df = fetch_historical_data(symbol, days=30, granularity='hour')
-                freq = 'H'
-                periods = 24
-                min_required = 24
-
-                # Fallback to minute-level if hourly insufficient
-                if df is None or len(df) < min_required:
-                    logger.info(f"Hourly data insufficient for {symbol}, falling back to minute-level")
-                    df = fetch_historical_data(symbol, days=30, granularity='minute', hours=1)
-                    freq = 'T'
-                    periods = 60  # next 60 minutes
-                    min_required = 10  # reduced requirement
-
-                # Relax requirements if we have some data
-                if df is not None and len(df) >= 10 and len(df) < min_required:
-                    logger.info(f"Relaxing requirements for {symbol}: using {len(df)} points instead of {min_required}")
-                    min_required = len(df)
-
-                if df is None or len(df) < 10:
-                    errors.append(f"Insufficient data for {symbol} (need at least 10 points, got {0 if df is None else len(df)})")
-                    continue
-
-                model = create_prophet_model(df)
-                if model is None:
-                    errors.append(f"Failed to create model for {symbol}")
-                    continue
-
-                forecast = generate_forecast(model, periods, freq=freq)
-                if forecast is None:
-                    errors.append(f"Failed to generate forecast for {symbol}")
-                    continue
-                
-                # Save to database
-                if save_forecast_to_db(symbol, forecast):
-                    results[symbol] = {
-                        'status': 'success',
-                        'forecast_points': len(forecast)
-                    }
-                else:
-                    errors.append(f"Failed to save forecast for {symbol}")
-                    
+                result, error = future.result()
+            except BrokenProcessPool as e:
+                # A worker process died (e.g. killed for memory), which fails
+                # every task still on the pool
+                discard_batch_pool(pool)
+                result, error = None, f"Error processing {symbol}: {str(e)}"
             except Exception as e:
-                errors.append(f"Error processing {symbol}: {str(e)}")
-                
-        return jsonify({
-            'processed_symbols': len(results),
-            'results': results,
-            'errors': errors
-        })
+                result, error = None, f"Error processing {symbol}: {str(e)}"
+            yield symbol, result, error
+    except FuturesTimeoutError:
+        # Workers stuck past their own alarm; don't wait on them any longer
+        logger.error(f"Batch exceeded {deadline:g}s with {len(pending)} symbols unfinished")
+        discard_batch_pool(pool, cancel=True)
+        for symbol in pending.values():
+            yield symbol, None, f"Timed out forecasting {symbol}: batch exceeded {deadline:g}s"
+
+def batch_forecast_engine(plans, fetch_seconds, model_name):
+    """Fit and predict a batch with a lightweight engine, all symbols at once.
+
+    Symbols with the same training window (hourly bars, or the minute
+    fallback) are aligned on one time grid and fitted and forecast together
+    (Engine.fit_many / forecast_many); every symbol's forecast starts after
+    the group's latest bar. The fit and predict times recorded in each run
+    are the group's, and params['batched'] is the group size. Yields
+    (symbol, result, error) like pooled_forecasts.
+    """
+    groups = {}
+    for symbol, (granularity, lookback, df) in plans.items():
+        groups.setdefault((granularity, lookback), {})[symbol] = df
+    for (granularity, lookback), frames in groups.items():
+        # Next 24 hours, or next 60 minutes
+        periods = 60 if granularity == 'minute' else 24
+        try:
+            started = time.perf_counter()
+            engine = ENGINES[model_name](interval_width=PROPHET_PARAMS['interval_width']).fit_many(frames)
+            fit_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            forecasts = engine.forecast_many(periods)
+            predict_seconds = time.perf_counter() - started
+        except Exception as e:
+            logger.error(f"Error fitting {model_name} on {len(frames)} {granularity} series: {str(e)}")
+            for symbol in frames:
+                yield symbol, None, f"Error processing {symbol}: {str(e)}"
+            continue
+        for row, (symbol, df) in enumerate(frames.items()):
+            run = new_run(granularity, lookback, df, model_name)
+            run['params'].update(engine.describe(row), fit='cold', batched=len(frames))
+            run.update(fetch_seconds=fetch_seconds, fit_seconds=fit_seconds,
+                       predict_seconds=predict_seconds)
+            yield symbol, {
+                'forecast': forecasts[symbol],
+                'run': run,
+                'fit': 'cold',
+                'fit_seconds': fit_seconds
+            }, None
+
+@app.route('/forecast/batch')
+def forecast_batch():
+    """Generate forecasts for all supported symbols: Prophet on a process
+    pool, the lightweight engines in one batched fit.
+
+    Optional `workers`, `timeout` (seconds per symbol) and `model` override
+    BATCH_WORKERS, SYMBOL_TIMEOUT_SECS and FORECAST_MODEL.
+    """
+    try:
+        args = batch_forecast_args()
+        if args['model'] not in MODELS:
+            return jsonify({'error': f"Unknown model {args['model']}", 'models': list(MODELS)}), 400
+        return jsonify(run_batch_forecast(**args))
         
     except Exception as e:
         logger.error(f"Error in batch forecast: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def batch_forecast_args():
+    """Query parameters of /forecast/batch (and /jobs/forecast/batch)"""
+    return dict(
+        workers=request.args.get('workers', BATCH_WORKERS, type=int),
+        timeout=request.args.get('timeout', SYMBOL_TIMEOUT_SECS, type=float),
+        model=request.args.get('model', FORECAST_MODEL, type=str)
+    )
+
+def run_batch_forecast(workers=BATCH_WORKERS, timeout=SYMBOL_TIMEOUT_SECS, model=FORECAST_MODEL,
+                       progress=_no_progress):
+    """Forecast every supported symbol; returns the /forecast/batch response body.
+
+    `progress(symbol, status, **details)` is told as each symbol is fitted
+    and saved.
+    """
+    from configs import SYMBOLS
+    
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model}")
+    workers = max(1, min(workers, len(SYMBOLS)))
+    
+    results = {}
+    forecasts = {}
+    started = time.perf_counter()
+    for symbol in SYMBOLS:
+        progress(symbol, 'queued')
+    
+    # One or two round trips for every symbol's training data
+    plans, errors = fetch_batch_training_data(SYMBOLS)
+    fetch_seconds = time.perf_counter() - started
+    for symbol in SYMBOLS:
+        if symbol in plans:
+            progress(symbol, 'running', stage='fit', fetch_seconds=round(fetch_seconds, 3))
+        else:
+            progress(symbol, 'failed', error='insufficient data')
+    
+    if model == 'prophet':
+        outcomes = pooled_forecasts(plans, fetch_seconds, workers, timeout, model)
+    else:
+        # The engines fit every symbol together, in one vectorized pass
+        outcomes = batch_forecast_engine(plans, fetch_seconds, model)
+    for done, (symbol, result, error) in enumerate(outcomes, 1):
+        if result:
+            forecasts[symbol] = result
+            if MODEL_CACHE is not None and model == 'prophet':
+                # Workers have their own caches; count their outcomes here
+                MODEL_CACHE.record(result['fit'], result['fit_seconds'])
+            progress(symbol, 'running', stage='save', fit=result['fit'],
+                     fit_seconds=round(result['fit_seconds'], 3),
+                     predict_seconds=round(result['run']['predict_seconds'], 3))
+            logger.info(f"Batch forecast for {symbol} done ({done}/{len(plans)})")
+        else:
+            errors.append(error)
+            progress(symbol, 'failed', error=error)
+            logger.warning(error)
+    
+    # Every symbol's run in one transaction; these runs are the chart's forecasts
+    run_ids = save_forecasts_to_db([(symbol, f['forecast'], f['run'])
+                                    for symbol, f in forecasts.items()], chart=True)
+    for symbol, f in forecasts.items():
+        if symbol not in run_ids:
+            errors.append(f"Failed to save forecast for {symbol}")
+            progress(symbol, 'failed', stage=None, error='save failed')
+            continue
+        results[symbol] = {
+            'status': 'success',
+            'forecast_points': len(f['forecast']),
+            'run_id': run_ids[symbol],
+            'fit': f['fit'],
+            'fit_seconds': round(f['fit_seconds'], 3)
+        }
+        progress(symbol, 'succeeded', stage=None, run_id=run_ids[symbol])
+            
+    return {
+        'processed_symbols': len(results),
+        'results': results,
+        'errors': errors,
+        'workers': workers,
+        'model': model,
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }
+
+def symbol_forecast_job(job, symbol, **args):
+    body, status = run_symbol_forecast(symbol, progress=job.update, **args)
+    return body, (body.get('error') if status != 200 else None)
+
+def batch_forecast_job(job, **args):
+    return run_batch_forecast(progress=job.update, **args), None
+
+def submit_job(queue, params, fn):
+    job, created = JOBS.submit(queue, params, fn)
+    logger.info(f"Job {job.id} ({queue}) {'queued' if created else 'already in flight'}: {params}")
+    return jsonify(dict(job.snapshot(), deduplicated=not created)), (202 if created else 200)
+
+@app.route('/jobs/forecast/batch', methods=['POST'])
+def submit_batch_job():
+    """Queue a /forecast/batch run; returns the job to poll at /jobs/<job_id>"""
+    args = batch_forecast_args()
+    if args['model'] not in MODELS:
+        return jsonify({'error': f"Unknown model {args['model']}", 'models': list(MODELS)}), 400
+    return submit_job('batch', args, batch_forecast_job)
+
+@app.route('/jobs/forecast/<symbol>', methods=['POST'])
+def submit_symbol_job(symbol):
+    """Queue a /forecast/<symbol> run; returns the job to poll at /jobs/<job_id>"""
+    return submit_job('symbol', dict(symbol_forecast_args(), symbol=symbol), symbol_forecast_job)
+
+@app.route('/jobs')
+def list_jobs():
+    """Queue occupancy and the jobs still retained, newest first"""
+    return jsonify({
+        'queues': JOBS.stats(),
+        'jobs': [job.snapshot() for job in JOBS.jobs()]
+    })
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Status, per-symbol progress and timings; includes the result once finished"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job.snapshot(result=job.finished))
+
+@app.route('/jobs/<job_id>/result')
+def get_job_result(job_id):
+    """The job's response body: 202 while it is queued or running"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    if not job.finished:
+        return jsonify({'job_id': job.id, 'status': job.status}), 202
+    return jsonify(job.result if job.result is not None else {'error': job.error})
+
+@app.route('/accuracy/refresh')
+def refresh_accuracy():
+    """Score forecast points that matured since the last call (init-scripts/007)"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT public.forecast_accuracy_refresh()")
+            matured = cursor.fetchone()[0]
+            conn.commit()
+            cursor.close()
+
+        logger.info(f"Scored {matured} matured forecast points")
+        return jsonify({'matured_points': matured})
+
+    except Exception as e:
+        logger.error(f"Error refreshing forecast accuracy: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Model cache hits (cached/warm), misses (cold), evictions and fit time"""
+    if MODEL_CACHE is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(MODEL_CACHE.snapshot(), enabled=True))
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
     try:
-        # Test database connection
-        conn = get_db_connection()
-        conn.close()
+        # Test a pooled connection
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
         return jsonify({'status': 'healthy', 'database': 'connected'})
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
@@ -362,7 +1045,15 @@ def index():
         'endpoints': [
             '/forecast/<symbol>?days=30&periods=24',
             '/forecast/<symbol>?granularity=minute&hours=3&periods=60',
+            '/forecast/<symbol>?model=holt_winters  (prophet, ewma, holt_winters, ar)',
             '/forecast/batch',
+            'POST /jobs/forecast/<symbol>',
+            'POST /jobs/forecast/batch',
+            '/jobs',
+            '/jobs/<job_id>',
+            '/jobs/<job_id>/result',
+            '/accuracy/refresh',
+            '/cache/stats',
             '/health'
         ]
     })
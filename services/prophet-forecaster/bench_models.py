@@ -0,0 +1,155 @@
+"""
+Benchmark the forecasting engines against Prophet on stored bars.
+
+For each symbol the stored series (coin_bars_1h, or coin_bars_1m with
+--granularity minute) is split into a training window and the last
+--horizon points; every model is fitted on the window through
+create_model / generate_forecast, exactly as the forecaster does, and
+scored on the held-out points. Reports, per model, mean fit and predict
+time, MAPE (mean and median over symbols) and interval coverage (the share
+of held-out points inside yhat_lower..yhat_upper; the target is
+interval_width, 0.8).
+
+The lightweight engines are also timed fitting every symbol at once
+(Engine.fit_many / forecast_many, as /forecast/batch does); --synthetic N
+replaces the stored bars with N generated random walks, to time batches of
+hundreds of symbols.
+
+    python bench_models.py --lookback 30 --horizon 24
+    python bench_models.py --granularity minute --lookback 3 --horizon 60
+    python bench_models.py --synthetic 500 --models ewma holt_winters ar
+"""
+
+import argparse
+import logging
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from app import (MODELS, PROPHET_PARAMS, create_model, fetch_historical_data_many,
+                 generate_forecast)
+from configs import SYMBOLS
+from engines import ENGINES
+
+
+def evaluate(model: str, train, actual, freq: str) -> dict:
+    started = time.perf_counter()
+    fitted = create_model(train, model)
+    fit_seconds = time.perf_counter() - started
+    if fitted is None:
+        return None
+    started = time.perf_counter()
+    forecast = generate_forecast(fitted, len(actual), freq=freq)
+    predict_seconds = time.perf_counter() - started
+    if forecast is None:
+        return None
+    yhat = forecast['yhat'].to_numpy()
+    inside = (actual >= forecast['yhat_lower'].to_numpy()) & (actual <= forecast['yhat_upper'].to_numpy())
+    return {
+        'fit': fit_seconds,
+        'predict': predict_seconds,
+        'mape': float(np.mean(np.abs(yhat - actual) / np.abs(actual)) * 100),
+        'coverage': float(inside.mean()),
+    }
+
+
+def evaluate_batch(model: str, trains: dict, actuals: dict) -> dict:
+    started = time.perf_counter()
+    engine = ENGINES[model](interval_width=PROPHET_PARAMS['interval_width']).fit_many(trains)
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    forecasts = engine.forecast_many(len(next(iter(actuals.values()))))
+    predict_seconds = time.perf_counter() - started
+    mape = [np.mean(np.abs(forecasts[symbol]['yhat'].to_numpy() - actual) / np.abs(actual)) * 100
+            for symbol, actual in actuals.items()]
+    return {'fit': fit_seconds, 'predict': predict_seconds, 'mape': float(np.mean(mape))}
+
+
+def synthetic_frames(count: int, points: int, freq: str, horizon: int) -> dict:
+    """Random walks with a daily cycle, all ending now; ~3% of the points
+    are missing, none of the last `horizon`, so every symbol's held-out
+    points cover the same times"""
+    rng = np.random.default_rng(0)
+    ds = pd.date_range(end=pd.Timestamp.now().floor(freq), periods=points, freq=freq)
+    cycle = np.sin(2 * np.pi * ((ds - ds[0]) / pd.Timedelta(days=1)).to_numpy())
+    frames = {}
+    for i in range(count):
+        y = rng.uniform(0.01, 1000) * np.exp(np.cumsum(rng.normal(0, 0.004, points))) * (1 + 0.004 * cycle)
+        keep = rng.random(points) >= 0.03
+        keep[-horizon:] = True
+        frames[f"SYN{i}"] = pd.DataFrame({'ds': ds[keep], 'y': y[keep]})
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--granularity", choices=("hour", "minute"), default="hour")
+    parser.add_argument("--lookback", type=int, default=30,
+                        help="training window: days (hour) or hours (minute)")
+    parser.add_argument("--horizon", type=int, default=24, help="held-out points to forecast")
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="use N generated series instead of stored bars")
+    args = parser.parse_args()
+    # Prophet / cmdstanpy log every fit
+    logging.disable(logging.INFO)
+
+    if args.synthetic:
+        per_unit, freq = (60, "min") if args.granularity == "minute" else (24, "h")
+        frames = synthetic_frames(args.synthetic, args.lookback * per_unit + args.horizon, freq,
+                                  args.horizon)
+        args.symbols = list(frames)
+    elif args.granularity == "minute":
+        # Training window plus the held-out minutes
+        frames = fetch_historical_data_many(args.symbols, granularity="minute",
+                                            hours=args.lookback + math.ceil(args.horizon / 60))
+        freq = "T"
+    else:
+        frames = fetch_historical_data_many(args.symbols, days=args.lookback + math.ceil(args.horizon / 24),
+                                            granularity="hour")
+        freq = "H"
+
+    scores = {model: [] for model in args.models}
+    skipped = []
+    trains, actuals = {}, {}
+    for symbol in args.symbols:
+        df = frames.get(symbol)
+        if df is None or len(df) < args.horizon + 10:
+            skipped.append(symbol)
+            continue
+        trains[symbol] = df.iloc[:-args.horizon].reset_index(drop=True)
+        actuals[symbol] = df['y'].iloc[-args.horizon:].to_numpy(dtype=float)
+        for model in args.models:
+            score = evaluate(model, trains[symbol], actuals[symbol], freq)
+            if score:
+                scores[model].append(score)
+
+    scored = max((len(s) for s in scores.values()), default=0)
+    print(f"{args.granularity} bars, {args.lookback} {'hours' if args.granularity == 'minute' else 'days'}"
+          f" of training, {args.horizon}-step horizon, {scored} symbols"
+          + (f" ({len(skipped)} without enough data)" if skipped else ""))
+    print(f"{'model':<14}{'fit ms':>10}{'predict ms':>12}{'MAPE %':>9}{'median':>9}{'coverage':>10}")
+    for model, results in scores.items():
+        if not results:
+            print(f"{model:<14}{'no successful fits':>30}")
+            continue
+        mean = lambda key: np.mean([r[key] for r in results])
+        print(f"{model:<14}{mean('fit') * 1000:>10.1f}{mean('predict') * 1000:>12.1f}"
+              f"{mean('mape'):>9.3f}{np.median([r['mape'] for r in results]):>9.3f}"
+              f"{mean('coverage'):>10.2f}")
+
+    engines = [model for model in args.models if model in ENGINES]
+    if trains and engines:
+        print(f"\nall {len(trains)} symbols in one fit")
+        print(f"{'model':<14}{'fit ms':>10}{'predict ms':>12}{'MAPE %':>9}")
+        for model in engines:
+            score = evaluate_batch(model, trains, actuals)
+            print(f"{model:<14}{score['fit'] * 1000:>10.1f}{score['predict'] * 1000:>12.1f}"
+                  f"{score['mape']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
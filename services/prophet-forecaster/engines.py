@@ -0,0 +1,359 @@
+"""
+Lightweight forecasting engines, alternatives to Prophet.
+
+Each engine fits a ds / y frame with a few NumPy passes (milliseconds, no
+Stan) and exposes the part of Prophet's interface the forecaster uses:
+`make_future_dataframe(periods, freq)` and `predict(future)`, which returns
+ds / yhat / yhat_lower / yhat_upper. Intervals are Gaussian around the
+point forecast, with the variance of the engine's h-step-ahead error, at
+`interval_width` coverage like Prophet's.
+
+    ewma          simple exponential smoothing (flat forecast)
+    holt_winters  additive Holt-Winters: damped trend + daily season
+    ar            AR(p) on first differences, least squares (ARIMA(p,1,0))
+
+The engines work on a symbols x time array: `fit_many(frames)` aligns many
+symbols' series on one time grid (NaN, masked out, where a symbol has no
+point) and fits them all in the same vectorized pass; `forecast_many`
+then forecasts every symbol from the end of the grid. A single series is
+the one-row case.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+DAY = pd.Timedelta(days=1)
+
+
+def align(frames: dict):
+    """Put ds / y frames on one time grid.
+
+    Returns (symbols, grid, values): `values` is len(symbols) x len(grid),
+    NaN where a symbol has no point. The grid step is the smallest median
+    spacing among the frames.
+    """
+    symbols = list(frames)
+    times = [df['ds'].to_numpy(dtype='datetime64[ns]').view('int64') for df in frames.values()]
+    steps = [np.median(np.diff(ns)) for ns in times if len(ns) > 1]
+    step = int(min(steps)) if steps else pd.Timedelta(hours=1).value
+    start = min(ns[0] for ns in times)
+    end = max(ns[-1] for ns in times)
+    grid = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq=pd.Timedelta(step))
+    values = np.full((len(symbols), len(grid)), np.nan)
+    for row, (ns, df) in enumerate(zip(times, frames.values())):
+        values[row, np.rint((ns - start) / step).astype(int)] = df['y'].to_numpy(dtype=float)
+    return symbols, grid, values
+
+
+def _masked_mean(values, mask, axis=-1):
+    """Mean of the unmasked values; NaN where there are none"""
+    count = mask.sum(axis=axis)
+    total = np.where(mask, values, 0.0).sum(axis=axis)
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+class Engine:
+    name = None
+
+    def __init__(self, interval_width: float = 0.8):
+        self.interval_width = interval_width
+        self.symbols = None
+        self.grid = None
+        # Per symbol: one-step-ahead in-sample predictions on the grid and
+        # their residual spread
+        self.fitted = None
+        self.sigma = None
+
+    def fit(self, df):
+        """Fit one series (Prophet-style)"""
+        if len(df) < 3:
+            raise ValueError(f"{self.name} needs at least 3 points, got {len(df)}")
+        return self.fit_many({None: df})
+
+    def fit_many(self, frames: dict):
+        """Fit {symbol: ds / y frame} together on a common time grid"""
+        self.symbols, self.grid, values = align(frames)
+        self.step = self.grid[1] - self.grid[0] if len(self.grid) > 1 else pd.Timedelta(hours=1)
+        self._fit(values, ~np.isnan(values))
+        return self
+
+    def forecast_many(self, periods: int) -> dict:
+        """{symbol: ds / yhat / yhat_lower / yhat_upper} for the `periods` steps after the grid"""
+        mean, sd = self._forecast(periods)
+        ds = pd.date_range(self.grid[-1], periods=periods + 1, freq=self.step)[1:]
+        lower, upper = self._bounds(mean, sd)
+        return {symbol: pd.DataFrame({'ds': ds, 'yhat': mean[row], 'yhat_lower': lower[row],
+                                      'yhat_upper': upper[row]}, copy=False)
+                for row, symbol in enumerate(self.symbols)}
+
+    def make_future_dataframe(self, periods: int, freq: str = 'H', include_history: bool = True):
+        future = pd.date_range(self.grid[-1], periods=periods + 1, freq=freq)[1:]
+        if include_history:
+            future = self.grid.append(future)
+        return pd.DataFrame({'ds': future})
+
+    def predict(self, future):
+        ds = future['ds'].reset_index(drop=True)
+        ahead = (ds > self.grid[-1]).to_numpy()
+        yhat = np.empty(len(ds))
+        spread = np.empty(len(ds))
+        past = pd.Series(self.fitted[0], index=self.grid)
+        yhat[~ahead] = past.reindex(ds[~ahead]).to_numpy()
+        spread[~ahead] = self.sigma[0]
+        mean, sd = self._forecast(int(ahead.sum()))
+        yhat[ahead], spread[ahead] = mean[0], sd[0]
+        lower, upper = self._bounds(yhat, spread)
+        return pd.DataFrame({'ds': ds, 'yhat': yhat, 'yhat_lower': lower, 'yhat_upper': upper})
+
+    def describe(self, row: int = 0) -> dict:
+        """A symbol's fitted parameters, recorded in forecast_runs.params"""
+        return {}
+
+    def _bounds(self, mean, sd):
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2)
+        return mean - z * sd, mean + z * sd
+
+    def _fit(self, values, mask):
+        raise NotImplementedError
+
+    def _forecast(self, periods: int):
+        """(mean, standard deviation), symbols x `periods`"""
+        raise NotImplementedError
+
+
+class HoltWinters(Engine):
+    """Additive Holt-Winters in error-correction form.
+
+    The smoothing parameters are chosen per symbol by one-step squared
+    error, in two rounds: level and season gains over a grid, then the
+    trend gain given those. Every symbol and candidate of a round is
+    filtered together, one loop over time with symbols x candidates arrays.
+    Missing points only advance the trend. The season is one day (like
+    Prophet's daily seasonality) and is left out with less than two days
+    of data.
+    """
+    name = 'holt_winters'
+    ALPHAS = np.linspace(0.1, 1.0, 10)
+    GAMMAS = (0.0, 0.05, 0.1, 0.2, 0.3)
+    # Trend gain, as a fraction of alpha
+    BETAS = (0.0, 0.01, 0.05, 0.1, 0.2)
+    # Trend damping, so 24 steps ahead don't extrapolate a spike
+    PHI = 0.98
+
+    def __init__(self, interval_width: float = 0.8, trend: bool = True, seasonal: bool = True):
+        super().__init__(interval_width)
+        self.trend = trend
+        self.seasonal = seasonal
+
+    def _fit(self, values, mask):
+        m = int(round(DAY / self.step)) if self.seasonal else 0
+        self.m = m if m > 1 and values.shape[1] >= 2 * m else 0
+        alpha, gamma = (g.ravel() for g in np.meshgrid(
+            self.ALPHAS, self.GAMMAS if self.m else (0.0,), indexing='ij'))
+        # Keep the seasonal gain within what the level leaves
+        keep = gamma <= 1 - alpha + 1e-9
+        alpha, gamma = alpha[keep], gamma[keep]
+        best = self._filter(values, mask, alpha, 0.0, gamma)[0].argmin(axis=1)
+        self.alpha, self.gamma = alpha[best], gamma[best]
+        self.beta = np.zeros(len(values))
+        if self.trend:
+            beta = self.alpha[:, None] * self.BETAS
+            best = self._filter(values, mask, self.alpha[:, None], beta, self.gamma[:, None])[0].argmin(axis=1)
+            self.beta = beta[np.arange(len(values)), best]
+        sse, self.fitted, self.level, self.slope, self.season = self._filter(
+            values, mask, self.alpha[:, None], self.beta[:, None], self.gamma[:, None], fitted=True)
+        self.sigma = np.sqrt(sse[:, 0] / np.maximum(mask.sum(axis=1), 1))
+
+    def _initial_state(self, values, mask):
+        """Level and season from each symbol's first two days on the grid, no slope.
+
+        Counted from the symbol's own first point, so a symbol fits the same
+        alone or among others that start earlier; until that point its
+        errors are masked and, with no slope, the state stays put.
+        """
+        (n, steps), m = values.shape, self.m
+        rows = np.arange(n)[:, None]
+        start = mask.argmax(axis=1)[:, None]
+        first = values[rows[:, 0], start[:, 0]]
+        if not m:
+            return first, np.zeros((n, 1))
+        cols = start + np.arange(2 * m)
+        inside = cols < steps
+        cols = np.minimum(cols, steps - 1)
+        days = values[rows, cols].reshape(n, 2, m)
+        days_mask = (mask[rows, cols] & inside).reshape(n, 2, m)
+        daily = _masked_mean(days[:, 0], days_mask[:, 0])
+        level = np.where(np.isnan(daily), first, daily)
+        overall = _masked_mean(days.reshape(n, -1), days_mask.reshape(n, -1))
+        # Season indexed by absolute grid position modulo m
+        season = np.empty((n, m))
+        season[rows, cols[:, :m] % m] = np.nan_to_num(
+            _masked_mean(days, days_mask, axis=1) - overall[:, None])
+        return level, season
+
+    def _filter(self, values, mask, alpha, beta, gamma, fitted=False):
+        """Run every (symbol, candidate); alpha / beta / gamma broadcast against symbols x candidates"""
+        n, steps = values.shape
+        m, phi = self.m, self.PHI if self.trend else 0.0
+        k = np.broadcast(np.empty((n, 1)), alpha, beta, gamma).shape[-1]
+        level0, season0 = self._initial_state(values, mask)
+        level = np.repeat(level0[:, None], k, axis=1)
+        slope = np.zeros((n, k))
+        # Season position first, so each step touches one contiguous block
+        season = np.repeat(season0.T[:, :, None], k, axis=2)
+        observed = np.where(mask, values, 0.0).T[:, :, None].copy()
+        weight = mask.T[:, :, None].astype(float)
+        sse = np.zeros((n, k))
+        pred = np.empty((n, k))
+        err = np.empty((n, k))
+        scratch = np.empty((n, k))
+        predictions = np.empty((n, steps)) if fitted else None
+        for t in range(steps):
+            # pred = level + phi * slope + s; err masked where there is no point
+            if self.trend:
+                slope *= phi
+                np.add(level, slope, out=pred)
+            else:
+                pred[...] = level
+            if m:
+                s = season[t % m]
+                pred += s
+            np.subtract(observed[t], pred, out=err)
+            err *= weight[t]
+            if fitted:
+                predictions[:, t] = pred[:, 0]
+            sse += np.multiply(err, err, out=scratch)
+            # level = pred - s + alpha * err, slope = phi * slope + beta * err,
+            # s = s + gamma * err
+            if self.trend:
+                level += slope
+                slope += np.multiply(beta, err, out=scratch)
+            level += np.multiply(alpha, err, out=scratch)
+            if m:
+                s += np.multiply(gamma, err, out=scratch)
+        return sse, predictions, level[:, 0], slope[:, 0], season[:, :, 0].T
+
+    def _forecast(self, periods):
+        h = np.arange(1, periods + 1)
+        damped = np.cumsum(self.PHI ** h) if self.trend else np.zeros(periods)
+        mean = self.level[:, None] + damped * self.slope[:, None]
+        if self.m:
+            mean = mean + self.season[:, (len(self.grid) + h - 1) % self.m]
+        # h-step error: sigma^2 (1 + sum_{j<h} c_j^2)
+        c = self.alpha[:, None] + self.beta[:, None] * damped[:-1]
+        if self.m:
+            c = c + self.gamma[:, None] * (h[:-1] % self.m == 0)
+        var = np.concatenate((np.ones((len(c), 1)), 1 + np.cumsum(c * c, axis=1)), axis=1)
+        return mean, self.sigma[:, None] * np.sqrt(var)
+
+    def describe(self, row=0):
+        return {'alpha': float(self.alpha[row]), 'beta': float(self.beta[row]),
+                'gamma': float(self.gamma[row]), 'phi': self.PHI if self.trend else None,
+                'season_length': self.m}
+
+
+class EWMA(HoltWinters):
+    """Simple exponential smoothing: Holt-Winters without trend or season"""
+    name = 'ewma'
+
+    def __init__(self, interval_width: float = 0.8):
+        super().__init__(interval_width, trend=False, seasonal=False)
+
+    def describe(self, row=0):
+        return {'alpha': float(self.alpha[row])}
+
+
+class AR(Engine):
+    """AR(p) with drift on first differences, fitted by least squares.
+
+    p is `order`, capped at a fifth of the typical series' differences so
+    short minute windows stay overdetermined. A symbol whose fitted AR part
+    is not stationary is refitted with half the order (down to p = 0, a
+    random walk with drift), so a jump in the data can't make its forecast
+    explode. All symbols of an order are solved together from batched
+    normal equations; differences next to a missing point are left out.
+    """
+    name = 'ar'
+
+    def __init__(self, interval_width: float = 0.8, order: int = 24):
+        super().__init__(interval_width)
+        self.order = order
+
+    @staticmethod
+    def _design(diffs, p):
+        """Regressors [1, d[t-1], ..., d[t-p]], targets d[t] and usable rows"""
+        windows = sliding_window_view(diffs, p + 1, axis=1)
+        # Usable: no missing difference in the window
+        missing = np.concatenate((np.zeros((len(diffs), 1), dtype=int),
+                                  np.isnan(diffs).cumsum(axis=1)), axis=1)
+        rows = missing[:, p + 1:] == missing[:, :-p - 1]
+        X = np.empty(rows.shape + (p + 1,))
+        X[..., 0] = 1.0
+        X[..., 1:] = windows[..., -2::-1]
+        X[~rows] = 0.0
+        return X, np.where(rows, windows[..., -1], 0.0), rows
+
+    def _fit(self, values, mask):
+        n = len(values)
+        diffs = np.diff(values, axis=1)
+        counts = (~np.isnan(diffs)).sum(axis=1)
+        p_max = max(1, min(self.order, int(np.median(counts)) // 5, diffs.shape[1] - 1))
+        # Normal equations once at the full order; a lower order solves
+        # their leading block (on the same rows)
+        X, target, rows = self._design(diffs, p_max)
+        Xt = X.transpose(0, 2, 1)
+        XtX, Xty = Xt @ X, (Xt @ target[..., None])[..., 0]
+        usable = rows.sum(axis=1)
+        # Padded with zeros beyond each symbol's own order
+        self.coef = np.zeros((n, p_max + 1))
+        self.p = np.zeros(n, dtype=int)
+        self.coef[:, 0] = np.nan_to_num(_masked_mean(diffs, ~np.isnan(diffs)))
+        pending, p = np.arange(n), p_max
+        while p >= 1 and len(pending):
+            # Pseudo-inverse: least squares even when regressors are collinear
+            coef = (np.linalg.pinv(XtX[pending, :p + 1, :p + 1])
+                    @ Xty[pending, :p + 1, None])[..., 0]
+            companion = np.zeros((len(pending), p, p))
+            companion[:, 0, :] = coef[:, 1:]
+            companion[:, np.arange(1, p), np.arange(p - 1)] = 1.0
+            stable = (usable[pending] > 2 * (p + 1)) & (
+                np.abs(np.linalg.eigvals(companion)).max(axis=1) < 1)
+            self.coef[pending[stable], :p + 1] = coef[stable]
+            self.p[pending[stable]] = p
+            pending, p = pending[~stable], p // 2
+
+        predicted = (X @ self.coef[..., None])[..., 0]
+        resid = (target - predicted) * rows
+        self.sigma = np.sqrt((resid ** 2).sum(axis=1) / np.maximum(rows.sum(axis=1), 1))
+        self.fitted = values.copy()
+        self.fitted[:, p_max + 1:] = np.where(rows, values[:, p_max:-1] + predicted,
+                                               values[:, p_max + 1:])
+        # Forecasts continue from each symbol's last observed value
+        self.last = values[np.arange(n), mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)]
+        self.recent = np.nan_to_num(diffs[:, ::-1][:, :p_max])
+
+    def _forecast(self, periods):
+        intercept, phi = self.coef[:, 0], self.coef[:, 1:]
+        p = phi.shape[1]
+        lags = self.recent.copy()
+        steps = np.empty((len(phi), periods))
+        for i in range(periods):
+            steps[:, i] = intercept + np.einsum('sk,sk->s', phi, lags)
+            lags = np.concatenate((steps[:, i:i + 1], lags), axis=1)[:, :p]
+        # psi weights of the differences, summed for the level
+        psi = np.zeros((len(phi), periods))
+        psi[:, 0] = 1.0
+        for j in range(1, periods):
+            k = min(j, p)
+            psi[:, j] = np.einsum('sk,sk->s', phi[:, :k], psi[:, j - 1::-1][:, :k])
+        var = np.cumsum(np.cumsum(psi, axis=1) ** 2, axis=1)
+        return self.last[:, None] + np.cumsum(steps, axis=1), self.sigma[:, None] * np.sqrt(var)
+
+    def describe(self, row=0):
+        return {'order': int(self.p[row]), 'drift': float(self.coef[row, 0])}
+
+
+ENGINES = {engine.name: engine for engine in (EWMA, HoltWinters, AR)}
@@ -0,0 +1,147 @@
+"""
+Background forecast jobs.
+
+A job is submitted to a named queue and runs on that queue's thread pool,
+so at most `concurrency` jobs of a queue execute at once and the rest wait
+in submission order. Submitting a job identical to one that is still
+queued or running (same queue, same parameters) returns the existing job
+instead of starting another. While it runs a job records per-symbol
+progress; once finished it keeps its result for `retention` seconds so
+clients can poll for it.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _iso(timestamp):
+    return datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class Job:
+    def __init__(self, queue: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.queue = queue
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, status: str, **details):
+        """Record a symbol's progress: its status plus e.g. timings."""
+        with self._lock:
+            self.progress.setdefault(symbol, {}).update(details, status=status)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def snapshot(self, result: bool = False) -> dict:
+        with self._lock:
+            progress = {symbol: dict(entry) for symbol, entry in self.progress.items()}
+        counts = {}
+        for entry in progress.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        end = self.finished_at or time.time()
+        data = {
+            'job_id': self.id,
+            'queue': self.queue,
+            'params': self.params,
+            'status': self.status,
+            'created_at': _iso(self.created_at),
+            'started_at': _iso(self.started_at),
+            'finished_at': _iso(self.finished_at),
+            'queued_seconds': round((self.started_at or end) - self.created_at, 3),
+            'elapsed_seconds': round(end - self.started_at, 3) if self.started_at else None,
+            'symbols': counts,
+            'progress': progress,
+            'error': self.error,
+        }
+        if result:
+            data['result'] = self.result
+        return data
+
+
+class JobManager:
+    def __init__(self, concurrency: dict, retention: float = 3600.0):
+        # concurrency: queue name -> jobs of that queue running at once
+        self.concurrency = dict(concurrency)
+        self.retention = retention
+        self._pools = {name: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"job-{name}")
+                       for name, n in self.concurrency.items()}
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, queue: str, params: dict, fn):
+        """Queue fn(job, **params) -> (result, error); returns (job, created).
+
+        `created` is False when an identical job was already in flight and
+        that job is returned instead.
+        """
+        key = (queue, tuple(sorted(params.items())))
+        with self._lock:
+            self._prune()
+            job = self._active.get(key)
+            if job is not None:
+                return job, False
+            job = Job(queue, params)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._pools[queue].submit(self._run, key, job, fn)
+        return job, True
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        with self._lock:
+            self._prune()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queues = {name: {'concurrency': n, QUEUED: 0, RUNNING: 0}
+                      for name, n in self.concurrency.items()}
+            for job in self._active.values():
+                queues[job.queue][job.status] += 1
+            return queues
+
+    def _run(self, key, job: Job, fn):
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result, job.error = fn(job, **job.params)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.queue}) failed: {str(e)}")
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job.status = FAILED if job.error else SUCCEEDED
+            with self._lock:
+                self._active.pop(key, None)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
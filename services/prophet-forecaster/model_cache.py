@@ -0,0 +1,182 @@
+"""
+Fitted Prophet models, cached per (symbol, granularity, lookback).
+
+A lookup with the current training frame either reuses the cached model
+(same bars as the ones it was fitted on, down to the last bar's value,
+which keeps changing until that bar closes), refits warm-started from its
+parameters (new or updated bars since), or fits from scratch (nothing
+cached, or the entry is older than the TTL). Entries are evicted least
+recently used first once `max_entries` is reached, and optionally written
+to `directory` as Prophet JSON so a restarted forecaster (or another worker
+process) picks them up.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from prophet.serialize import model_from_json, model_to_json
+
+logger = logging.getLogger(__name__)
+
+# Outcomes reported by ModelCache.fit
+CACHED = "cached"
+WARM = "warm"
+COLD = "cold"
+
+
+def warm_start_params(model) -> dict:
+    """Stan init values from a fitted model (Prophet's "updating fitted models")."""
+    params = {}
+    for name in ("k", "m", "sigma_obs"):
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0][0]
+        else:
+            params[name] = np.mean(model.params[name])
+    for name in ("delta", "beta"):
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0]
+        else:
+            params[name] = np.mean(model.params[name], axis=0)
+    return params
+
+
+class CacheEntry:
+    def __init__(self, model, last_ds, last_y: float, points: int, fitted_at: float):
+        self.model = model
+        self.last_ds = last_ds
+        self.last_y = last_y
+        self.points = points
+        self.fitted_at = fitted_at
+
+    def matches(self, last_ds, last_y: float, points: int) -> bool:
+        return self.last_ds == last_ds and self.last_y == last_y and self.points == points
+
+
+class ModelCache:
+    def __init__(self, fit, max_entries: int = 64, ttl: float = 3600.0,
+                 directory: str = ""):
+        # fit(df, init) -> fitted model or None; init is None for a cold fit
+        self._fit = fit
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {CACHED: 0, WARM: 0, COLD: 0, "evictions": 0,
+                      "warm_failures": 0, "fit_seconds": {WARM: 0.0, COLD: 0.0}}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def fit(self, key: tuple, df):
+        """Fitted model for `df` under `key`; returns (model, outcome, seconds)."""
+        last_ds, last_y, points = df['ds'].iloc[-1], float(df['y'].iloc[-1]), len(df)
+        entry = self._get(key)
+        if entry and entry.matches(last_ds, last_y, points):
+            self.record(CACHED)
+            return entry.model, CACHED, 0.0
+
+        started = time.perf_counter()
+        model, outcome = None, COLD
+        if entry:
+            # Fails e.g. when the number of changepoints differs from last time
+            model, outcome = self._fit(df, warm_start_params(entry.model)), WARM
+            if model is None:
+                logger.info(f"Warm start failed for {key}, fitting from scratch")
+                with self._lock:
+                    self.stats["warm_failures"] += 1
+        if model is None:
+            model, outcome = self._fit(df, None), COLD
+        seconds = time.perf_counter() - started
+        if model is not None:
+            self._put(key, CacheEntry(model, last_ds, last_y, points, time.time()))
+        self.record(outcome, seconds)
+        return model, outcome, seconds
+
+    def record(self, outcome: str, seconds: float = 0.0):
+        """Count a lookup (also used for outcomes reported by batch workers)."""
+        with self._lock:
+            self.stats[outcome] += 1
+            if outcome != CACHED:
+                self.stats["fit_seconds"][outcome] += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats[CACHED] + self.stats[WARM] + self.stats[COLD]
+            return dict(
+                self.stats,
+                fit_seconds=dict(self.stats["fit_seconds"]),
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl,
+                hit_ratio=(self.stats[CACHED] + self.stats[WARM]) / lookups if lookups else None,
+            )
+
+    def _path(self, key: tuple) -> str:
+        return os.path.join(self.directory, "_".join(map(str, key)) + ".json")
+
+    def _get(self, key: tuple):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry.fitted_at > self.ttl:
+                del self._entries[key]
+                self.stats["evictions"] += 1
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                return entry
+        if self.directory:
+            return self._load(key, now)
+        return None
+
+    def _put(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        if self.directory:
+            self._save(key, entry)
+
+    def _load(self, key: tuple, now: float):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached model {path}: {e}")
+            return None
+        if now - stored['fitted_at'] > self.ttl:
+            return None
+        model = model_from_json(stored['model'])
+        # Prophet's JSON keeps y to 10 digits, so the exact value is stored
+        # alongside (files written before that fall back to the history)
+        last_y = stored.get('last_y', float(model.history['y'].iloc[-1]))
+        entry = CacheEntry(model, model.history['ds'].iloc[-1], last_y,
+                           stored['points'], stored['fitted_at'])
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return entry
+
+    def _save(self, key: tuple, entry: CacheEntry):
+        path = self._path(key)
+        try:
+            # Write then rename, so readers never see half a file
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({'model': model_to_json(entry.model), 'points': entry.points,
+                           'last_y': entry.last_y, 'fitted_at': entry.fitted_at}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not persist cached model {path}: {e}")
@@ -35,6 +35,25 @@ class ForecastScheduler:
             logger.error(f"Health check failed: {str(e)}")
             return False
     
+    def run_job(self, path: str, params: dict = None, timeout: float = 600, poll: float = 5):
+        """Submit a forecast job and wait for it; returns the finished job, or None"""
+        response = requests.post(f"{self.prophet_url}{path}", params=params, timeout=10)
+        if response.status_code not in (200, 202):
+            logger.error(f"Submitting {path} failed with status {response.status_code}: {response.text}")
+            return None
+        job = response.json()
+        if job.get('deduplicated'):
+            logger.info(f"  - Joined job {job['job_id']} already in flight")
+        
+        deadline = time.time() + timeout
+        while job['status'] not in ('succeeded', 'failed'):
+            if time.time() > deadline:
+                logger.error(f"Job {job['job_id']} still {job['status']} after {timeout}s")
+                return None
+            time.sleep(poll)
+            job = requests.get(f"{self.prophet_url}/jobs/{job['job_id']}", timeout=10).json()
+        return job
+    
     def trigger_batch_forecast(self) -> bool:
         """Trigger batch forecasting for all symbols"""
         try:
@@ -44,11 +63,11 @@ class ForecastScheduler:
                 logger.error("Prophet service is not healthy, skipping forecast")
                 return False
             
-            response = requests.get(f"{self.prophet_url}/forecast/batch", timeout=600)
+            job = self.run_job("/jobs/forecast/batch", timeout=600)
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Batch forecast completed successfully:")
+            if job and job['status'] == 'succeeded':
+                result = job['result']
+                logger.info(f"Batch forecast completed successfully in {job['elapsed_seconds']}s:")
                 logger.info(f"  - Processed symbols: {result.get('processed_symbols', 0)}")
                 logger.info(f"  - Errors: {len(result.get('errors', []))}")
                 
@@ -58,32 +77,45 @@ class ForecastScheduler:
                 
                 return True
             else:
-                logger.error(f"Batch forecast failed with status {response.status_code}: {response.text}")
+                logger.error(f"Batch forecast failed: {job and job['error']}")
                 return False
                 
         except Exception as e:
             logger.error(f"Error during batch forecast: {str(e)}")
             return False
     
+    def refresh_accuracy(self) -> bool:
+        """Score forecast points whose actuals have arrived"""
+        try:
+            response = requests.get(f"{self.prophet_url}/accuracy/refresh", timeout=120)
+            
+            if response.status_code == 200:
+                logger.info(f"Accuracy refresh: {response.json().get('matured_points', 0)} points scored")
+                return True
+            else:
+                logger.error(f"Accuracy refresh failed with status {response.status_code}: {response.text}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error during accuracy refresh: {str(e)}")
+            return False
+    
     def trigger_single_forecast(self, symbol: str, days: int = 30, periods: int = 24) -> bool:
         """Trigger forecast for a single symbol"""
         try:
             logger.info(f"Starting forecast for {symbol}...")
             
-            params = {"days": days, "periods": periods}
-            response = requests.get(
-                f"{self.prophet_url}/forecast/{symbol}",
-                params=params,
-                timeout=300
-            )
+            # Scheduled runs refresh the stored forecast rather than reuse it
+            params = {"days": days, "periods": periods, "force": "true"}
+            job = self.run_job(f"/jobs/forecast/{symbol}", params=params, timeout=300)
             
-            if response.status_code == 200:
-                result = response.json()
+            if job and job['status'] == 'succeeded':
+                result = job['result']
                 logger.info(f"Forecast for {symbol} completed successfully")
                 logger.info(f"  - Forecast periods: {result.get('forecast_periods', 0)}")
                 return True
             else:
-                logger.error(f"Forecast for {symbol} failed: {response.text}")
+                logger.error(f"Forecast for {symbol} failed: {job and job['error']}")
                 return False
                 
         except Exception as e:
@@ -102,10 +134,14 @@ def main():
     for symbol in priority_symbols:
         schedule.every(30).minutes.do(scheduler.trigger_single_forecast, symbol=symbol)
     
+    # Score matured forecast points every 5 minutes
+    schedule.every(5).minutes.do(scheduler.refresh_accuracy)
+    
     logger.info("Prophet Forecast Scheduler started")
     logger.info("Scheduled tasks:")
     logger.info("  - Batch forecast: Every hour")
     logger.info(f"  - Priority symbols ({', '.join(priority_symbols)}): Every 30 minutes")
+    logger.info("  - Accuracy refresh: Every 5 minutes")
     
     # Run initial forecast
     logger.info("Running initial batch forecast...")
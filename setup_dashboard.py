@@ -192,7 +192,8 @@ class SupersetDashboardCreator:
         
         # Create datasets
         datasets = {}
-        tables = ['coin_ticks', 'coin_forecasts', 'coin_data_with_forecasts']
+        tables = ['coin_ticks', 'coin_bars_1m', 'coin_bars_1h', 'coin_forecasts', 'coin_data_with_forecasts',
+                  'forecast_accuracy_daily']
         
         for table in tables:
             dataset = self.create_dataset(table, database_id)
@@ -204,12 +205,12 @@ class SupersetDashboardCreator:
             {
                 "slice_name": "Real-time Crypto Prices",
                 "viz_type": "line",
-                "datasource_id": datasets.get('coin_ticks', {}).get('id'),
+                "datasource_id": datasets.get('coin_bars_1m', {}).get('id'),
                 "datasource_type": "table",
                 "params": json.dumps({
-                    "metrics": ["price"],
+                    "metrics": ["close"],
                     "groupby": ["symbol"],
-                    "granularity_sqla": "event_time",
+                    "granularity_sqla": "bucket",
                     "time_range": "Last 24 hours",
                     "color_scheme": "prophet_forecast"
                 })
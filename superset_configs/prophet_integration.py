@@ -25,16 +25,30 @@ class ProphetForecaster:
             return {"error": str(e)}
     
     def get_batch_forecast(self) -> Dict[str, Any]:
-        """Get forecasts for all supported symbols"""
+        """Start forecasts for all supported symbols as a background job"""
         try:
-            url = f"{self.base_url}/forecast/batch"
+            url = f"{self.base_url}/jobs/forecast/batch"
             
-            response = requests.get(url, timeout=600)
+            response = requests.post(url, timeout=10)
             response.raise_for_status()
             
+            # Poll get_job(job_id) for progress and the result
             return response.json()
         except Exception as e:
-            current_app.logger.error(f"Error getting batch forecast: {str(e)}")
+            current_app.logger.error(f"Error starting batch forecast: {str(e)}")
+            return {"error": str(e)}
+    
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """Status, per-symbol progress and (once finished) result of a job"""
+        try:
+            url = f"{self.base_url}/jobs/{job_id}"
+            
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
+            
+            return response.json()
+        except Exception as e:
+            current_app.logger.error(f"Error getting job {job_id}: {str(e)}")
             return {"error": str(e)}
     
     def health_check(self) -> bool:
@@ -60,16 +74,23 @@ def trigger_batch_forecast():
     result = prophet_forecaster.get_batch_forecast()
     return json.dumps(result)
 
+def get_forecast_job(job_id: str):
+    """Custom function to check on a batch forecast job"""
+    result = prophet_forecaster.get_job(job_id)
+    return json.dumps(result)
+
 # Register custom functions with Superset
 CUSTOM_TEMPLATE_PROCESSORS = {
     'prophet_forecast': get_forecast_data,
     'trigger_batch_forecast': trigger_batch_forecast,
+    'prophet_job': get_forecast_job,
 }
 
 # Jinja template context for use in SQL Lab
 JINJA_CONTEXT_ADDONS = {
     'prophet_forecast': get_forecast_data,
     'trigger_batch_forecast': trigger_batch_forecast,
+    'prophet_job': get_forecast_job,
 }
 
 # Allow custom functions in SQL Lab
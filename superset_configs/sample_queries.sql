@@ -26,16 +26,17 @@ WITH latest_actual AS (
     GROUP BY symbol, price
 ),
 latest_forecast AS (
+    -- Each symbol's latest run via the forecast_latest pointer (init-scripts/006)
     SELECT 
-        symbol,
-        forecast_time,
-        predicted_price,
-        lower_bound,
-        upper_bound,
-        ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY forecast_time) as forecast_rank
-    FROM public.coin_forecasts
-    WHERE created_at >= NOW() - INTERVAL '2 hours'
-        AND forecast_time > NOW()
+        p.symbol,
+        p.forecast_time,
+        p.predicted_price,
+        p.lower_bound,
+        p.upper_bound,
+        ROW_NUMBER() OVER (PARTITION BY p.symbol ORDER BY p.forecast_time) as forecast_rank
+    FROM public.forecast_latest l
+    JOIN public.forecast_run_points p ON p.run_id = l.run_id
+    WHERE p.forecast_time > NOW()
 )
 SELECT 
     a.symbol,
@@ -52,35 +53,25 @@ WHERE f.forecast_rank <= 24  -- Next 24 hours
 ORDER BY a.symbol, f.forecast_time;
 
 -- 3. Forecast accuracy analysis (compare predictions with actual values)
-WITH forecast_vs_actual AS (
-    SELECT 
-        f.symbol,
-        f.forecast_time,
-        f.predicted_price,
-        f.lower_bound,
-        f.upper_bound,
-        a.price as actual_price,
-        ABS(f.predicted_price - a.price) as absolute_error,
-        ABS(f.predicted_price - a.price) / a.price * 100 as percentage_error,
-        CASE 
-            WHEN a.price BETWEEN f.lower_bound AND f.upper_bound THEN true 
-            ELSE false 
-        END as within_bounds
-    FROM public.coin_forecasts f
-    INNER JOIN public.coin_ticks a ON f.symbol = a.symbol
-        AND ABS(EXTRACT(EPOCH FROM (f.forecast_time - a.event_time))) < 1800  -- 30 minutes tolerance
-    WHERE f.forecast_time < NOW() - INTERVAL '1 hour'  -- Only past forecasts
-)
+-- Reads the incrementally scored runs (init-scripts/007); the forecaster's
+-- /accuracy/refresh, called by the scheduler, scores points as they mature
 SELECT 
     symbol,
-    COUNT(*) as total_forecasts,
-    ROUND(AVG(percentage_error), 2) as avg_error_percent,
-    ROUND(STDDEV(percentage_error), 2) as error_std_dev,
-    ROUND(AVG(CASE WHEN within_bounds THEN 1.0 ELSE 0.0 END) * 100, 2) as accuracy_within_bounds_percent
-FROM forecast_vs_actual
-GROUP BY symbol
+    granularity,
+    scored_points as total_forecasts,
+    ROUND(mape::numeric, 2) as avg_error_percent,
+    ROUND(mae::numeric, 8) as mean_absolute_error,
+    ROUND((coverage * 100)::numeric, 2) as accuracy_within_bounds_percent
+FROM public.forecast_accuracy_by_symbol
+WHERE scored_points > 0
 ORDER BY avg_error_percent;
 
+-- 3b. Accuracy trend per day
+SELECT symbol, day, runs, scored_points, mape, coverage
+FROM public.forecast_accuracy_daily
+WHERE day >= NOW() - INTERVAL '30 days'
+ORDER BY symbol, day;
+
 -- 4. Top performing and worst performing forecasts
 SELECT 
     symbol,
@@ -95,18 +86,19 @@ ORDER BY created_at DESC
 LIMIT 100;
 
 -- 5. Hourly price volatility for better Prophet model parameters
+-- Reads the 1-minute bars (60 rows per symbol-hour instead of every tick)
 SELECT 
     symbol,
-    DATE_TRUNC('hour', event_time) as hour,
-    COUNT(*) as tick_count,
-    MIN(price) as min_price,
-    MAX(price) as max_price,
-    AVG(price) as avg_price,
-    STDDEV(price) as price_volatility,
-    (MAX(price) - MIN(price)) / AVG(price) * 100 as hourly_volatility_percent
-FROM public.coin_ticks
-WHERE event_time >= NOW() - INTERVAL '7 days'
-GROUP BY symbol, DATE_TRUNC('hour', event_time)
+    DATE_TRUNC('hour', bucket) as hour,
+    SUM(tick_count) as tick_count,
+    MIN(low) as min_price,
+    MAX(high) as max_price,
+    SUM(price_sum) / SUM(tick_count) as avg_price,
+    STDDEV(close) as price_volatility,
+    (MAX(high) - MIN(low)) / (SUM(price_sum) / SUM(tick_count)) * 100 as hourly_volatility_percent
+FROM public.coin_bars_1m
+WHERE bucket >= NOW() - INTERVAL '7 days'
+GROUP BY symbol, DATE_TRUNC('hour', bucket)
 ORDER BY symbol, hour DESC;
 
 -- 6. Real-time dashboard query - Latest data with forecasts
@@ -127,6 +119,7 @@ FROM (
     SELECT DISTINCT ON (symbol) 
         symbol, event_time, price, price_change_percent
     FROM public.coin_ticks 
+    WHERE event_time >= NOW() - INTERVAL '1 day'  -- only the newest partitions
     ORDER BY symbol, event_time DESC
 ) c
 LEFT JOIN (